@@ -6,9 +6,14 @@ import datetime
 from config import (
     JWT_SECRET_KEY, JWT_ACCESS_TOKEN_EXPIRES, JWT_REFRESH_TOKEN_EXPIRES,
     API_SECRET_KEY, GOOGLE_CLIENT_ID_WEB, MAIL_SERVER, MAIL_PORT,
-    MAIL_USE_TLS, MAIL_USE_SSL, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER
+    MAIL_USE_TLS, MAIL_USE_SSL, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER,
+    WARMUP_ON_STARTUP, QUESTION_BANK_ENABLED, QUESTION_BANK_REFRESHER_EMBEDDED, JOB_WORKER_EMBEDDED,
+    MAX_FRAMES_PER_BATCH
 )
 from database import init_db, get_collections
+from lazy_loader import warmup
+from frame_upload import max_request_bytes
+from job_queue import start_embedded_worker
 
 # Import Blueprints
 from routes.auth_routes import auth_bp
@@ -19,7 +24,7 @@ from routes.chat_routes import chat_bp
 from routes.admin_routes import admin_bp
 from routes.web_auth_routes import web_auth_bp
 from routes.web_admin_routes import web_admin_bp
-from routes.ai_interview_routes import ai_interview_bp # <--- NEW: Import AI Interview Blueprint
+from routes.ai_interview_routes import ai_interview_bp, start_question_bank_refresher # <--- NEW: Import AI Interview Blueprint
 
 # Konfigurasi logging Flask
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,6 +46,12 @@ app.config['JWT_REFRESH_TOKEN_EXPIRES'] = JWT_REFRESH_TOKEN_EXPIRES
 app.config['API_SECRET_KEY'] = API_SECRET_KEY
 app.config['GOOGLE_CLIENT_ID_WEB'] = GOOGLE_CLIENT_ID_WEB
 
+# Batas body global untuk semua route (juga upload chunked tanpa Content-Length); endpoint frame memakai batas lebih ketat
+app.config['MAX_CONTENT_LENGTH'] = max_request_bytes(MAX_FRAMES_PER_BATCH)
+
+# WebSocket (flask-sock): ping agar koneksi idle tidak diputus proxy, dan batasi ukuran satu pesan frame
+app.config['SOCK_SERVER_OPTIONS'] = {'ping_interval': 25, 'max_message_size': max_request_bytes()}
+
 # Mailer configuration
 app.config['MAIL_SERVER'] = MAIL_SERVER
 app.config['MAIL_PORT'] = MAIL_PORT
@@ -68,6 +79,20 @@ app.register_blueprint(web_auth_bp)
 app.register_blueprint(web_admin_bp)
 app.register_blueprint(ai_interview_bp) # <--- NEW REGISTRATION FOR AI INTERVIEW
 
+# Modul ML/SDK (cv2, mediapipe, Gemini, nltk) dimuat secara lazy saat request pertama.
+# Set WARMUP_ON_STARTUP=true untuk memuatnya sebelum menerima traffic.
+if WARMUP_ON_STARTUP:
+    logger.info(f"Warmup selesai: {warmup()}")
+
+# Pool pertanyaan topik katalog diisi di background agar start_session tidak menunggu Gemini;
+# di produksi refresher dijalankan oleh job_worker.py, bukan oleh setiap proses web
+if QUESTION_BANK_ENABLED and QUESTION_BANK_REFRESHER_EMBEDDED:
+    start_question_bank_refresher()
+
+# Job finalisasi sesi diproses oleh job_worker.py; thread embedded hanya untuk development
+if JOB_WORKER_EMBEDDED:
+    start_embedded_worker()
+
 # Landing Page / Root route
 @app.route("/")
 def home():
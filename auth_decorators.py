@@ -20,6 +20,32 @@ def get_user_by_id(user_id):
         logger.error(f"Error converting user_id to ObjectId or finding user: {e}")
         return None
 
+def is_valid_api_key(api_key):
+    """Checks an API key outside of a decorated view (e.g. when a WebSocket stream opens)."""
+    return bool(api_key) and api_key == current_app.config.get('API_SECRET_KEY')
+
+def get_user_from_token(token):
+    """
+    Validates a JWT outside of a decorated HTTP view, e.g. once when a WebSocket
+    stream opens. Returns (current_user, None) on success or (None, error_message).
+    """
+    if not token:
+        return None, "Token is missing"
+    try:
+        data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+        current_user = get_user_by_id(data['user_id'])
+    except jwt.ExpiredSignatureError:
+        return None, "Token has expired"
+    except jwt.InvalidTokenError:
+        return None, "Invalid token"
+    except Exception as e:
+        logger.error(f"Error during token decoding or user retrieval: {e}")
+        return None, "An unexpected error occurred during token validation."
+    if not current_user:
+        return None, "User not found"
+    current_user['_id'] = str(current_user['_id']) # Ensure _id is string for serialization
+    return current_user, None
+
 def require_api_key(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -0,0 +1,260 @@
+# benchmarks/detectors.py
+"""
+Benchmark detektor visual dengan memutar ulang frame dari video di data/.
+
+Setiap kasus dijalankan di interpreter baru agar peak RSS dan state model
+(tracker, cache) tidak saling memengaruhi:
+  - pose_detector, mouth_detector, facial_expression_detector, emotion_detector:
+    wrapper detect_* per detektor (satu frame ndarray per panggilan)
+  - analyze_face: satu panggilan FaceMesh untuk semua label
+  - analyze_frame: path lengkap endpoint /analyze_frame (decode base64 ->
+    runtime detektor dengan tracker sesi dan cache -> jendela temporal)
+
+Laporan JSON berisi frames/sec, latensi p50/p95/p99, peak RSS, label per
+frame, dan (dengan --baseline) persentase label yang sama dengan laporan
+sebelumnya, sehingga hasil antar commit bisa dibandingkan.
+
+Contoh:
+    python benchmarks/detectors.py --output bench_before.json
+    python benchmarks/detectors.py --baseline bench_before.json --output bench_after.json
+"""
+import argparse
+import base64
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEO_PATTERNS = ("data/flustereds/*.mp4", "data/netrals/*.mp4")
+
+# Nama kasus -> kategori label yang dihasilkan
+CASES = {
+    "pose_detector": ("pose",),
+    "mouth_detector": ("mouth",),
+    "facial_expression_detector": ("expression",),
+    "emotion_detector": ("emotion",),
+    "analyze_face": ("pose", "mouth", "expression", "emotion"),
+    "analyze_frame": ("pose", "mouth", "expression", "emotion"),
+}
+
+def collect_frames(stride, max_frames_per_video):
+    """Frame sampel sebagai list (video, indeks_frame, bytes JPEG)."""
+    import cv2
+    frames = []
+    for pattern in VIDEO_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+            capture = cv2.VideoCapture(path)
+            index = 0
+            taken = 0
+            while taken < max_frames_per_video:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if index % stride == 0:
+                    frames.append((os.path.relpath(path, ROOT), index, cv2.imencode(".jpg", frame)[1].tobytes()))
+                    taken += 1
+                index += 1
+            capture.release()
+    return frames
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+def build_case(name):
+    """Mengembalikan fungsi (video, bytes_jpeg) -> dict label untuk satu kasus."""
+    from detectors.frame_decoder import decode_frame_bytes
+
+    if name == "analyze_frame":
+        from detectors.frame_decoder import decode_base64_frame
+        from detectors.runtime import get_detector_runtime
+        from detectors.temporal_aggregator import get_temporal_aggregator
+
+        def run(video, data):
+            frame = decode_base64_frame(base64.b64encode(data).decode())
+            session_key = f"benchmark:{video}"
+            result = get_detector_runtime().analyze(frame, session_key=session_key)
+            get_temporal_aggregator().push(session_key, result)
+            return {category: result[category] for category in CASES[name]}
+        return run
+
+    if name == "analyze_face":
+        from detectors.face_analyzer import analyze_face
+
+        def run(video, data):
+            result = analyze_face(decode_frame_bytes(data))
+            return {category: result[category] for category in CASES[name]}
+        return run
+
+    from detectors.emotion_detector import detect_emotion_status
+    from detectors.facial_expression_detector import detect_facial_expression
+    from detectors.mouth_detector import detect_mouth_status
+    from detectors.pose_detector import detect_pose_status
+    detector = {
+        "pose_detector": detect_pose_status,
+        "mouth_detector": detect_mouth_status,
+        "facial_expression_detector": detect_facial_expression,
+        "emotion_detector": detect_emotion_status,
+    }[name]
+    category = CASES[name][0]
+
+    def run(video, data):
+        return {category: detector(decode_frame_bytes(data))}
+    return run
+
+def run_child(args):
+    """Satu kasus di proses baru; mencetak hasil sebagai satu baris JSON."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    with open(args.frames_file) as handle:
+        frames = [(video, index, base64.b64decode(data)) for video, index, data in json.load(handle)]
+    run = build_case(args.case)
+
+    # Frame pertama memuat model; diukur terpisah dari latensi steady-state
+    started = time.perf_counter()
+    run(frames[0][0], frames[0][2])
+    first_frame_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    latencies = []
+    labels = []
+    total_started = time.perf_counter()
+    for repeat in range(args.repeat):
+        for video, index, data in frames:
+            started = time.perf_counter()
+            result = run(video, data)
+            latencies.append(time.perf_counter() - started)
+            if repeat == 0:
+                labels.append(result)
+    total_seconds = time.perf_counter() - total_started
+
+    print(json.dumps({
+        "frames": len(latencies),
+        "fps": round(len(latencies) / total_seconds, 2),
+        "first_frame_ms": first_frame_ms,
+        "latency_ms": {
+            "mean": round(float(np.mean(latencies)) * 1000, 3),
+            "p50": percentile_ms(latencies, 50),
+            "p95": percentile_ms(latencies, 95),
+            "p99": percentile_ms(latencies, 99),
+        },
+        # ru_maxrss dalam KB di Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "labels": {
+            category: [result[category] for result in labels]
+            for category in CASES[args.case]
+        },
+    }))
+
+def label_agreement(current, baseline):
+    """Persentase frame dengan label sama per kategori, untuk kasus yang ada di kedua laporan."""
+    agreement = {}
+    for case, result in current["cases"].items():
+        previous = baseline.get("cases", {}).get(case)
+        if not previous or previous.get("frame_ids") != result["frame_ids"]:
+            continue
+        agreement[case] = {
+            category: round(float(np.mean([a == b for a, b in zip(labels, previous["labels"][category])])), 4)
+            for category, labels in result["labels"].items()
+            if category in previous.get("labels", {})
+        }
+    return agreement
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_parent(args):
+    sys.path.insert(0, ROOT)
+    cases = args.cases or list(CASES)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Kasus tidak dikenal: {sorted(unknown)}; pilihan: {list(CASES)}")
+
+    frames = collect_frames(args.stride, args.max_frames)
+    if not frames:
+        raise SystemExit("Tidak ada frame dari data/flustereds atau data/netrals.")
+    frame_ids = [f"{video}#{index}" for video, index, _ in frames]
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as handle:
+        json.dump([(video, index, base64.b64encode(data).decode()) for video, index, data in frames], handle)
+        frames_file = handle.name
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"stride": args.stride, "max_frames_per_video": args.max_frames, "repeat": args.repeat},
+        "cases": {},
+    }
+    try:
+        for case in cases:
+            command = [
+                sys.executable, os.path.abspath(__file__), "--child",
+                "--case", case, "--frames-file", frames_file, "--repeat", str(args.repeat)
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr)
+                raise SystemExit(f"Kasus {case} gagal (exit code {completed.returncode})")
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            result["frame_ids"] = frame_ids
+            report["cases"][case] = result
+            print(
+                f"{case:28s} {result['fps']:8.1f} fps  p50 {result['latency_ms']['p50']:8.2f} ms  "
+                f"p95 {result['latency_ms']['p95']:8.2f} ms  p99 {result['latency_ms']['p99']:8.2f} ms  "
+                f"rss {result['peak_rss_mb']:7.1f} MB",
+                file=sys.stderr
+            )
+    finally:
+        os.unlink(frames_file)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        report["baseline"] = {"path": args.baseline, "revision": baseline.get("revision")}
+        report["label_agreement"] = label_agreement(report, baseline)
+
+    output = json.dumps(report)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    summary = {
+        case: {key: result[key] for key in ("fps", "latency_ms", "peak_rss_mb", "first_frame_ms")}
+        for case, result in report["cases"].items()
+    }
+    if "label_agreement" in report:
+        summary["label_agreement"] = report["label_agreement"]
+    print(json.dumps(summary, indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detektor visual dengan video di data/.")
+    parser.add_argument("--cases", nargs="+", help=f"kasus yang dijalankan (default: semua): {', '.join(CASES)}")
+    parser.add_argument("--stride", type=int, default=2, help="ambil setiap frame ke-N dari video")
+    parser.add_argument("--max-frames", type=int, default=60, help="frame maksimum per video")
+    parser.add_argument("--repeat", type=int, default=1, help="ulangi seluruh frame N kali untuk pengukuran")
+    parser.add_argument("--baseline", help="laporan JSON sebelumnya untuk menghitung kesamaan label")
+    parser.add_argument("--output", help="simpan laporan JSON lengkap ke file ini")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--frames-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    else:
+        run_parent(args)
+
+if __name__ == "__main__":
+    main()
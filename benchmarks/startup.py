@@ -0,0 +1,118 @@
+# benchmarks/startup.py
+"""
+Mengukur waktu startup aplikasi dan latensi request pertama.
+
+Setiap percobaan dijalankan di interpreter baru (seperti worker yang baru
+di-restart) dan mengukur:
+  - import_seconds: waktu `import app` (semua blueprint terdaftar)
+  - warmup_seconds: waktu lazy_loader.warmup() (hanya dengan --warmup)
+  - first_frame_seconds: decode + analisis frame pertama lewat runtime detektor
+  - second_frame_seconds: frame berikutnya (model sudah dimuat)
+
+Contoh:
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --runs 5 --warmup --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_VIDEO = os.path.join(ROOT, "data", "netrals", "netral.mp4")
+METRICS = ("import_seconds", "warmup_seconds", "first_frame_seconds", "second_frame_seconds")
+
+def read_sample_frame_bytes(video_path):
+    """Frame pertama video sampel sebagai bytes JPEG (seperti yang dikirim klien)."""
+    import cv2
+    capture = cv2.VideoCapture(video_path)
+    ok, frame = capture.read()
+    capture.release()
+    if not ok:
+        raise SystemExit(f"Tidak dapat membaca frame dari {video_path}")
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+def run_child(args):
+    """Satu percobaan di proses baru. Mencetak hasil sebagai satu baris JSON."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    frame_bytes = open(args.frame_file, "rb").read()
+
+    started = time.perf_counter()
+    import app  # noqa: F401
+    result = {"import_seconds": time.perf_counter() - started}
+
+    if args.warmup:
+        from lazy_loader import warmup
+        started = time.perf_counter()
+        warmup()
+        result["warmup_seconds"] = time.perf_counter() - started
+
+    from detectors.frame_decoder import decode_frame_bytes
+    from detectors.runtime import get_detector_runtime
+    for name in ("first_frame_seconds", "second_frame_seconds"):
+        started = time.perf_counter()
+        get_detector_runtime().analyze(decode_frame_bytes(frame_bytes))
+        result[name] = time.perf_counter() - started
+
+    from lazy_loader import loaded_modules
+    result["lazy_modules"] = loaded_modules()
+    print(json.dumps(result))
+
+def run_parent(args):
+    import tempfile
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as handle:
+        handle.write(read_sample_frame_bytes(args.video))
+        frame_file = handle.name
+
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--frame-file", frame_file]
+    if args.warmup:
+        command.append("--warmup")
+
+    runs = []
+    try:
+        for index in range(args.runs):
+            completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr)
+                raise SystemExit(f"Percobaan {index + 1} gagal (exit code {completed.returncode})")
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    finally:
+        os.unlink(frame_file)
+
+    report = {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "median": {
+            metric: round(statistics.median(run[metric] for run in runs), 4)
+            for metric in METRICS if metric in runs[0]
+        },
+        "lazy_modules": runs[-1]["lazy_modules"],
+        "raw": runs,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark waktu startup dan latensi request pertama.")
+    parser.add_argument("--runs", type=int, default=3, help="jumlah proses baru yang diukur")
+    parser.add_argument("--warmup", action="store_true", help="jalankan lazy_loader.warmup() setelah import")
+    parser.add_argument("--video", default=DEFAULT_VIDEO, help="video sumber frame sampel")
+    parser.add_argument("--output", help="simpan laporan JSON ke file ini")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--frame-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    else:
+        run_parent(args)
+
+if __name__ == "__main__":
+    main()
@@ -119,4 +119,117 @@ INTERVIEW_TOPICS = {
         "prompt_context": "Anda adalah pewawancara yang fokus pada kemampuan pemecahan masalah. Berikan skenario atau tanyakan pengalaman mereka dalam mengidentifikasi masalah, menganalisis akar penyebab, dan menerapkan solusi efektif.",
         "keywords": ["masalah", "solusi", "analisis", "logika", "inovatif", "strategi", "data"],
     },
-}
\ No newline at end of file
+}
+# ======================== REALTIME FRAME ANALYSIS ========================
+# Jumlah maksimum frame yang boleh dikirim dalam satu request batch
+MAX_FRAMES_PER_BATCH = int(os.environ.get('MAX_FRAMES_PER_BATCH', 30))
+
+# Backend runtime detektor: 'thread' (FaceMesh thread-local) atau 'process' (pool proses ter-warmup)
+DETECTOR_BACKEND = os.environ.get('DETECTOR_BACKEND', 'thread')
+DETECTOR_WORKERS = int(os.environ.get('DETECTOR_WORKERS', os.cpu_count() or 1))
+DETECTOR_TIMEOUT_SECONDS = float(os.environ.get('DETECTOR_TIMEOUT_SECONDS', 10))
+
+# Tracker FaceMesh mode video per sesi wawancara (LRU + TTL untuk sesi idle).
+# Setiap tracker memakan ~30 MB RSS (tracker pertama ~96 MB termasuk model), dan batas ini
+# berlaku per proses detektor: total ~ DETECTOR_WORKERS x TRACKER_MAX_SESSIONS x 30 MB pada backend "process".
+TRACKER_MAX_SESSIONS = int(os.environ.get('TRACKER_MAX_SESSIONS', 12))
+TRACKER_IDLE_TTL_SECONDS = float(os.environ.get('TRACKER_IDLE_TTL_SECONDS', 120))
+
+# Pra-pemrosesan frame: sisi terpanjang setelah downscale dan margin crop ROI wajah
+FRAME_TARGET_MAX_SIDE = int(os.environ.get('FRAME_TARGET_MAX_SIDE', 640))
+FACE_ROI_MARGIN = float(os.environ.get('FACE_ROI_MARGIN', 0.25))
+
+# Cache hasil untuk frame yang hampir identik (dHash pada area wajah, jarak Hamming)
+FRAME_CACHE_HASH_SIZE = int(os.environ.get('FRAME_CACHE_HASH_SIZE', 16))
+FRAME_CACHE_HAMMING_THRESHOLD = int(os.environ.get('FRAME_CACHE_HAMMING_THRESHOLD', 12))
+FRAME_CACHE_MAX_AGE_SECONDS = float(os.environ.get('FRAME_CACHE_MAX_AGE_SECONDS', 3))
+FRAME_CACHE_MAX_SESSIONS = int(os.environ.get('FRAME_CACHE_MAX_SESSIONS', 256))
+
+# Jendela temporal per sesi untuk smoothing hasil deteksi dan skor kepercayaan diri
+ANALYSIS_WINDOW_FRAMES = int(os.environ.get('ANALYSIS_WINDOW_FRAMES', 90))
+ANALYSIS_WINDOW_SECONDS = float(os.environ.get('ANALYSIS_WINDOW_SECONDS', 30))
+ANALYSIS_WINDOW_MAX_SESSIONS = int(os.environ.get('ANALYSIS_WINDOW_MAX_SESSIONS', 512))
+# /process_response memakai jendela tanpa inferensi ulang jika frame terakhirnya tidak lebih tua dari ini
+ANALYSIS_WINDOW_FRESH_SECONDS = float(os.environ.get('ANALYSIS_WINDOW_FRESH_SECONDS', 3))
+
+# ======================== STARTUP ========================
+# Muat modul ML/SDK dan FaceMesh saat startup alih-alih saat request pertama
+WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
+
+# ======================== EXPRESSION CLASSIFIER ========================
+# Bobot classifier ekspresi terlatih (training/train_expression.py). Jika file tidak ada,
+# atau confidence prediksi di bawah ambang, detektor berbasis aturan yang dipakai.
+EXPRESSION_MODEL_PATH = os.environ.get(
+    'EXPRESSION_MODEL_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'expression_classifier.npz')
+)
+EXPRESSION_MIN_CONFIDENCE = float(os.environ.get('EXPRESSION_MIN_CONFIDENCE', 0.6))
+
+# ======================== FRAME UPLOAD ========================
+# Batas ukuran satu frame (multipart / body image/jpeg mentah); request JSON base64 dibatasi ~4/3 kali nilai ini
+MAX_FRAME_UPLOAD_BYTES = int(os.environ.get('MAX_FRAME_UPLOAD_BYTES', 2 * 1024 * 1024))
+
+# ======================== FRAME STREAM (WEBSOCKET) ========================
+# Batas waktu pesan autentikasi pertama dan batas idle sebelum stream ditutup
+STREAM_AUTH_TIMEOUT_SECONDS = float(os.environ.get('STREAM_AUTH_TIMEOUT_SECONDS', 10))
+STREAM_IDLE_TIMEOUT_SECONDS = float(os.environ.get('STREAM_IDLE_TIMEOUT_SECONDS', 60))
+# Interval pengecekan ulang status sesi; stream ditutup jika sesi diakhiri di tengah jalan
+STREAM_SESSION_CHECK_SECONDS = float(os.environ.get('STREAM_SESSION_CHECK_SECONDS', 5))
+
+# ======================== BACKPRESSURE ========================
+# Frame dalam antrean runtime detektor sebelum endpoint frame membalas 429 (0 = 4 x DETECTOR_WORKERS)
+DETECTOR_MAX_QUEUE_DEPTH = int(os.environ.get('DETECTOR_MAX_QUEUE_DEPTH', 0))
+DETECTOR_LATENCY_EWMA_ALPHA = float(os.environ.get('DETECTOR_LATENCY_EWMA_ALPHA', 0.2))
+# Batas rekomendasi interval frame berikutnya yang dikirim ke klien
+FRAME_INTERVAL_MIN_MS = int(os.environ.get('FRAME_INTERVAL_MIN_MS', 100))
+FRAME_INTERVAL_MAX_MS = int(os.environ.get('FRAME_INTERVAL_MAX_MS', 2000))
+
+# ======================== FACE GATE ========================
+# Deteksi wajah short-range yang murah sebelum FaceMesh; frame tanpa wajah tidak menjalankan FaceMesh
+FACE_GATE_ENABLED = os.environ.get('FACE_GATE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+FACE_GATE_MAX_SIDE = int(os.environ.get('FACE_GATE_MAX_SIDE', 320))
+FACE_GATE_MIN_CONFIDENCE = float(os.environ.get('FACE_GATE_MIN_CONFIDENCE', 0.5))
+# Bounding box deteksi wajah lebih ketat dari sebaran landmark, jadi margin crop-nya lebih besar
+FACE_GATE_ROI_MARGIN = float(os.environ.get('FACE_GATE_ROI_MARGIN', 0.5))
+
+# ======================== LLM ========================
+# Panggilan Gemini dijalankan di thread pool terbatas agar bisa berjalan paralel dengan analisis visual
+LLM_WORKERS = int(os.environ.get('LLM_WORKERS', 8))
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 20))
+# Batas waktu umpan balik per jawaban; jika terlewati, dipakai penilai lokal (local_scorer.py)
+LLM_FEEDBACK_DEADLINE_SECONDS = float(os.environ.get('LLM_FEEDBACK_DEADLINE_SECONDS', 8))
+# 'gemini' atau 'local' (stub deterministik tanpa jaringan, untuk load test offline)
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini').lower()
+# Latensi buatan stub lokal per panggilan, agar load test menyerupai LLM sungguhan
+LLM_STUB_LATENCY_MS = float(os.environ.get('LLM_STUB_LATENCY_MS', 0))
+
+# ======================== LLM CACHE ========================
+# Respons Gemini di-cache di memori (LRU) dan di koleksi Mongo llm_cache (TTL index)
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 1024))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+
+# ======================== QUESTION BANK ========================
+# Pool pertanyaan per topik INTERVIEW_TOPICS yang dibuat di background, agar start_session tidak menunggu Gemini
+QUESTION_BANK_ENABLED = os.environ.get('QUESTION_BANK_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Pool diisi oleh satu proses khusus (`python job_worker.py`). Set true hanya untuk development
+# dengan satu proses web: setiap proses yang mengimpor app akan menjalankan refresher-nya sendiri.
+QUESTION_BANK_REFRESHER_EMBEDDED = os.environ.get('QUESTION_BANK_REFRESHER_EMBEDDED', 'false').lower() in ('1', 'true', 'yes')
+QUESTION_BANK_POOL_SIZE = int(os.environ.get('QUESTION_BANK_POOL_SIZE', 40))
+QUESTION_BANK_BATCH_SIZE = int(os.environ.get('QUESTION_BANK_BATCH_SIZE', 10))
+# Batch baru ditambahkan (dan pertanyaan tertua dibuang) jika batch terakhir lebih tua dari ini
+QUESTION_BANK_REFRESH_SECONDS = float(os.environ.get('QUESTION_BANK_REFRESH_SECONDS', 24 * 3600))
+QUESTION_BANK_CHECK_INTERVAL_SECONDS = float(os.environ.get('QUESTION_BANK_CHECK_INTERVAL_SECONDS', 300))
+QUESTIONS_PER_SESSION = int(os.environ.get('QUESTIONS_PER_SESSION', 5))
+
+# ======================== JOB QUEUE ========================
+# Job background (mis. finalisasi sesi) disimpan di koleksi Mongo jobs dan diproses oleh job_worker.py.
+# Deployment: jalankan `python job_worker.py` sebagai proses terpisah di samping proses web.
+# JOB_WORKER_EMBEDDED=true menjalankan worker sebagai thread di setiap proses yang mengimpor app;
+# hanya untuk development dengan satu proses web tanpa job_worker.py.
+JOB_WORKER_EMBEDDED = os.environ.get('JOB_WORKER_EMBEDDED', 'false').lower() in ('1', 'true', 'yes')
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', 1))
+# Job yang sedang diproses dianggap macet (worker mati) jika lease-nya habis, lalu diambil worker lain
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 180))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_BACKOFF_SECONDS = float(os.environ.get('JOB_RETRY_BACKOFF_SECONDS', 10))
@@ -18,6 +18,9 @@ password_reset_tokens_collection = None
 otp_tokens_collection = None
 topics_collection = None            # Koleksi untuk topik diskusi
 login_history_collection = None     # <--- TAMBAHKAN INI: Deklarasi global untuk koleksi riwayat login
+llm_cache_collection = None         # Cache respons Gemini (TTL)
+question_bank_collection = None     # Pool pertanyaan per topik INTERVIEW_TOPICS
+jobs_collection = None              # Antrean job background (job_queue.py)
 interviews_collection = None
 
 def init_db():
@@ -27,7 +30,7 @@ def init_db():
            sessions_collection, \
            login_attempts_collection, messages_collection, password_reset_tokens_collection, \
            otp_tokens_collection, topics_collection, \
-           login_history_collection
+           login_history_collection, llm_cache_collection, question_bank_collection, jobs_collection
 
     try:
         client = MongoClient(MONGO_URI)
@@ -43,6 +46,9 @@ def init_db():
         otp_tokens_collection = db["otp_tokens"]
         topics_collection = db["topics"]
         login_history_collection = db["login_history"]
+        llm_cache_collection = db["llm_cache"]
+        question_bank_collection = db["question_bank"]
+        jobs_collection = db["jobs"]
 
         logger.info("MongoDB connected and collections initialized.")
     except Exception as e:
@@ -69,5 +75,8 @@ def get_collections():
         "password_reset_tokens": password_reset_tokens_collection,
         "otp_tokens": otp_tokens_collection,
         "topics": topics_collection,
-        "login_history": login_history_collection # <--- TAMBAHKAN INI: Termasuk koleksi riwayat login
+        "login_history": login_history_collection, # <--- TAMBAHKAN INI: Termasuk koleksi riwayat login
+        "llm_cache": llm_cache_collection,
+        "question_bank": question_bank_collection,
+        "jobs": jobs_collection
     }
\ No newline at end of file
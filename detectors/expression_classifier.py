@@ -0,0 +1,97 @@
+# detectors/expression_classifier.py
+import logging
+import os
+import threading
+
+import numpy as np
+
+from config import EXPRESSION_MODEL_PATH, EXPRESSION_MIN_CONFIDENCE
+from detectors.landmark_features import normalized_landmarks
+
+logger = logging.getLogger(__name__)
+
+class ExpressionClassifier:
+    """
+    Regresi logistik multinomial (softmax) di atas landmark ternormalisasi
+    (lihat normalized_landmarks). Inferensi hanya standardisasi + satu perkalian
+    matriks, baik untuk satu frame maupun satu batch. Bobot dilatih oleh
+    training/train_expression.py dan disimpan sebagai file .npz kecil.
+    """
+
+    def __init__(self, labels, mean, scale, weights, bias):
+        self.labels = tuple(str(label) for label in labels)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["labels"], data["mean"], data["scale"], data["weights"], data["bias"])
+
+    def save(self, path):
+        np.savez(
+            path, labels=np.asarray(self.labels), mean=self.mean,
+            scale=self.scale, weights=self.weights, bias=self.bias
+        )
+
+    def predict_proba(self, inputs):
+        """Probabilitas tiap label untuk input (D,) atau (B, D)."""
+        logits = ((inputs - self.mean) / self.scale) @ self.weights + self.bias
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=-1, keepdims=True)
+
+    def predict_landmarks(self, points):
+        """
+        Prediksi dari landmark (N, 3) atau (B, N, 3). Mengembalikan (label, confidence)
+        untuk satu frame, atau list pasangan tersebut untuk batch.
+        """
+        probabilities = self.predict_proba(normalized_landmarks(points))
+        best = probabilities.argmax(axis=-1)
+        if probabilities.ndim == 1:
+            return self.labels[int(best)], float(probabilities[best])
+        return [
+            (self.labels[int(index)], float(row[index]))
+            for index, row in zip(best, probabilities)
+        ]
+
+_classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+def get_expression_classifier():
+    """
+    Mengembalikan classifier global, dimuat sekali dari EXPRESSION_MODEL_PATH.
+    Mengembalikan None jika file bobot tidak ada atau gagal dimuat, sehingga
+    pemanggil memakai detektor berbasis aturan.
+    """
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        with _classifier_lock:
+            if not _classifier_loaded:
+                if EXPRESSION_MODEL_PATH and os.path.exists(EXPRESSION_MODEL_PATH):
+                    try:
+                        _classifier = ExpressionClassifier.load(EXPRESSION_MODEL_PATH)
+                        logger.info(f"Expression classifier loaded from {EXPRESSION_MODEL_PATH} with labels {_classifier.labels}.")
+                    except Exception as e:
+                        logger.error(f"Failed to load expression classifier: {e}. Using rule-based detection.")
+                else:
+                    logger.info("Expression classifier weights not found. Using rule-based detection.")
+                _classifier_loaded = True
+    return _classifier
+
+def classify_expression_landmarks(points):
+    """
+    Label ekspresi dari classifier terlatih jika tersedia dan cukup yakin
+    (>= EXPRESSION_MIN_CONFIDENCE). Mengembalikan None agar pemanggil
+    memakai aturan sebagai fallback.
+    """
+    classifier = get_expression_classifier()
+    if classifier is None:
+        return None
+    label, confidence = classifier.predict_landmarks(points)
+    if confidence < EXPRESSION_MIN_CONFIDENCE:
+        return None
+    return label
@@ -0,0 +1,181 @@
+# detectors/face_analyzer.py
+import logging
+import threading
+
+from config import FACE_GATE_ENABLED, FACE_GATE_ROI_MARGIN, FACE_ROI_MARGIN
+from detectors.frame_decoder import load_image
+from detectors.landmark_features import extract_features, feature_dict, landmarks_to_array
+from detectors.preprocess import crop_to_roi, downscale_frame, landmarks_bbox, remap_landmarks
+from detectors.emotion_detector import classify_emotion_status
+from detectors.expression_classifier import classify_expression_landmarks
+from detectors.face_gate import detect_face_box
+from detectors.facial_expression_detector import classify_facial_expression
+from detectors.mouth_detector import classify_mouth_status
+from detectors.pose_detector import classify_pose_status
+from lazy_loader import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# cv2 dan mediapipe baru di-import saat frame pertama dianalisis (atau saat warmup)
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+
+# Instance FaceMesh tidak aman dipakai bersama antar thread, jadi setiap thread
+# (atau proses worker) memegang instance-nya sendiri. Dalam satu thread, satu
+# instance dipakai bersama oleh semua detektor sehingga setiap frame hanya
+# membayar satu kali inferensi landmark.
+_thread_local = threading.local()
+
+def create_face_mesh(static_image_mode=True):
+    """
+    Membuat instance FaceMesh baru. static_image_mode=False mengaktifkan mode video:
+    deteksi wajah penuh hanya dijalankan saat tracking landmark hilang.
+    """
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+def get_face_mesh():
+    """Mengembalikan instance FaceMesh milik thread saat ini, membuatnya jika belum ada."""
+    face_mesh = getattr(_thread_local, "face_mesh", None)
+    if face_mesh is None:
+        try:
+            face_mesh = create_face_mesh()
+            _thread_local.face_mesh = face_mesh
+            logger.info(f"MediaPipe FaceMesh initialized for thread {threading.current_thread().name}.")
+        except Exception as e:
+            logger.error(f"Failed to initialize MediaPipe FaceMesh: {e}")
+            return None
+    return face_mesh
+
+# Nilai default tiap detektor ketika wajah tidak ditemukan (sama dengan perilaku lama)
+NO_FACE_RESULT = {
+    "pose": "unknown",
+    "mouth": "diam",
+    "expression": "tidak terdeteksi",
+    "emotion": "normal",
+    "face_box": None,
+    "features": None
+}
+
+def _detect_landmarks(face_mesh, image):
+    """Menjalankan FaceMesh pada satu gambar BGR. Mengembalikan array landmark (N, 3) wajah pertama atau None."""
+    try:
+        results = face_mesh.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    except Exception as e:
+        logger.error(f"Error processing image with MediaPipe: {e}")
+        return None
+    if not results or not results.multi_face_landmarks:
+        return None
+    return landmarks_to_array(results.multi_face_landmarks[0].landmark)
+
+def _detect_landmarks_in_roi(face_mesh, image, roi, margin=FACE_ROI_MARGIN):
+    """
+    FaceMesh pada crop roi (+ margin) dari frame resolusi asli; hanya crop yang
+    dikecilkan, bukan seluruh frame. Landmark dikembalikan ternormalisasi
+    terhadap frame penuh, atau None jika wajah tidak ditemukan.
+    """
+    crop, origin = crop_to_roi(image, roi, margin)
+    if crop is None:
+        return None
+    landmarks = _detect_landmarks(face_mesh, downscale_frame(crop))
+    if landmarks is None:
+        return None
+    return remap_landmarks(landmarks, origin, crop.shape, image.shape)
+
+def analyze_face(image, face_mesh=None, roi=None, include_landmarks=False) -> dict:
+    """
+    Menerima ndarray BGR, bytes gambar, atau path file; men-decode sekali,
+    menjalankan FaceMesh sekali, lalu menurunkan status pose, mulut, ekspresi,
+    dan emosi dari satu set landmark yang sama.
+
+    Jika roi (bounding box wajah frame sebelumnya, lihat "face_box" pada hasil)
+    diberikan, FaceMesh hanya dijalankan pada area tersebut plus margin, memakai
+    face_mesh (mis. tracker mode video per sesi) bila ada. Jika wajah hilang dari
+    crop atau roi tidak ada, gate deteksi wajah short-range (face_gate) dijalankan
+    dulu pada salinan kecil frame: tanpa wajah, hasil "tidak terdeteksi" langsung
+    dikembalikan tanpa FaceMesh dan tanpa mengecilkan frame penuh; dengan wajah,
+    FaceMesh dijalankan pada crop bounding box dari gate. Frame penuh (dikecilkan
+    ke FRAME_TARGET_MAX_SIDE) dengan instance static milik thread hanya dipakai
+    jika gate tidak tersedia atau FaceMesh gagal pada crop tersebut. Crop diambil
+    dari frame resolusi asli dan hanya crop itu yang dikecilkan.
+
+    include_landmarks=True menambahkan "landmarks" (array (N, 3) ternormalisasi
+    terhadap frame) ke hasil, mis. untuk ekstraksi dataset training.
+    """
+    static_face_mesh = get_face_mesh()
+    if not static_face_mesh:
+        logger.error("FaceMesh instance is not available. Cannot perform detection.")
+        return dict(NO_FACE_RESULT)
+
+    image = load_image(image)
+    if image is None:
+        logger.warning("Could not decode image for face analysis.")
+        return dict(NO_FACE_RESULT)
+
+    landmarks = None
+    if roi is not None:
+        landmarks = _detect_landmarks_in_roi(face_mesh or static_face_mesh, image, roi)
+        if landmarks is None:
+            logger.debug("Face lost inside ROI, falling back to face gate.")
+    if landmarks is None and FACE_GATE_ENABLED:
+        gate_box = detect_face_box(image)
+        if gate_box is None:
+            logger.debug("Face gate found no face, skipping FaceMesh.")
+            return dict(NO_FACE_RESULT)
+        if gate_box:
+            landmarks = _detect_landmarks_in_roi(
+                face_mesh or static_face_mesh, image, gate_box, margin=FACE_GATE_ROI_MARGIN
+            )
+    if landmarks is None:
+        # Deteksi frame penuh selalu memakai instance static: tracker mode video hanya
+        # melihat crop ROI, karena bergantian antara crop dan frame penuh membuat
+        # state tracking-nya tidak pernah valid.
+        landmarks = _detect_landmarks(static_face_mesh, downscale_frame(image))
+
+    if landmarks is None:
+        logger.debug("No face landmarks detected.")
+        return dict(NO_FACE_RESULT)
+
+    # Semua fitur geometris dihitung sekali secara vektor, lalu dipakai bersama oleh semua aturan
+    features = extract_features(landmarks, image.shape)
+    named_features = feature_dict(features)
+
+    # Ekspresi dan emosi dari classifier terlatih; aturan hanya sebagai fallback
+    expression = classify_expression_landmarks(landmarks)
+    if expression is None:
+        expression = classify_facial_expression(named_features)
+        emotion = classify_emotion_status(named_features)
+    else:
+        emotion = "gugup" if expression == "gugup" else "normal"
+
+    result = {
+        "pose": classify_pose_status(named_features),
+        "mouth": classify_mouth_status(named_features),
+        "expression": expression,
+        "emotion": emotion,
+        "face_box": landmarks_bbox(landmarks),
+        "features": features
+    }
+    if include_landmarks:
+        result["landmarks"] = landmarks
+    return result
+
+def summarize_analyses(analyses, keys=("pose", "mouth", "expression")) -> dict:
+    """Agregasi hasil per-frame: distribusi label dan label dominan untuk tiap kategori."""
+    summary = {"frames_analyzed": len(analyses)}
+    for key in keys:
+        counts = {}
+        for analysis in analyses:
+            label = analysis.get(key)
+            counts[label] = counts.get(label, 0) + 1
+        total = sum(counts.values())
+        summary[key] = {
+            "dominant": max(counts, key=counts.get) if counts else None,
+            "distribution": {label: round(count / total, 3) for label, count in counts.items()}
+        }
+    return summary
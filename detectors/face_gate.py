@@ -0,0 +1,62 @@
+# detectors/face_gate.py
+import logging
+import threading
+
+from config import FACE_GATE_MAX_SIDE, FACE_GATE_MIN_CONFIDENCE
+from detectors.preprocess import downscale_frame
+from lazy_loader import lazy_import
+
+logger = logging.getLogger(__name__)
+
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+
+# Seperti FaceMesh, instance FaceDetection dipegang per thread
+_thread_local = threading.local()
+
+def get_face_detector():
+    """Mengembalikan FaceDetection short-range (model_selection=0) milik thread saat ini."""
+    detector = getattr(_thread_local, "face_detector", None)
+    if detector is None:
+        try:
+            detector = mp.solutions.face_detection.FaceDetection(
+                model_selection=0,
+                min_detection_confidence=FACE_GATE_MIN_CONFIDENCE
+            )
+            _thread_local.face_detector = detector
+            logger.info(f"MediaPipe FaceDetection initialized for thread {threading.current_thread().name}.")
+        except Exception as e:
+            logger.error(f"Failed to initialize MediaPipe FaceDetection: {e}")
+            return None
+    return detector
+
+def detect_face_box(image):
+    """
+    Gate murah sebelum FaceMesh: menjalankan deteksi wajah short-range pada
+    salinan frame asli yang dikecilkan ke FACE_GATE_MAX_SIDE. Mengembalikan bounding
+    box ternormalisasi (x0, y0, x1, y1) wajah paling yakin, atau None jika tidak
+    ada wajah. Mengembalikan False jika detektor tidak tersedia, agar pemanggil
+    tetap menjalankan FaceMesh pada frame penuh.
+    """
+    detector = get_face_detector()
+    if detector is None:
+        return False
+    # Model short-range memakai input 128x128, jadi resize linear ke sisi kecil sudah cukup
+    small = downscale_frame(image, FACE_GATE_MAX_SIDE, interpolation=cv2.INTER_LINEAR)
+    try:
+        results = detector.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    except Exception as e:
+        logger.error(f"Error processing image with MediaPipe FaceDetection: {e}")
+        return False
+    if not results or not results.detections:
+        return None
+
+    detection = max(results.detections, key=lambda item: item.score[0] if item.score else 0.0)
+    box = detection.location_data.relative_bounding_box
+    x0 = min(max(box.xmin, 0.0), 1.0)
+    y0 = min(max(box.ymin, 0.0), 1.0)
+    x1 = min(max(box.xmin + box.width, 0.0), 1.0)
+    y1 = min(max(box.ymin + box.height, 0.0), 1.0)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1, y1)
@@ -0,0 +1,94 @@
+# detectors/frame_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import (
+    FRAME_CACHE_HASH_SIZE, FRAME_CACHE_HAMMING_THRESHOLD,
+    FRAME_CACHE_MAX_AGE_SECONDS, FRAME_CACHE_MAX_SESSIONS
+)
+from lazy_loader import lazy_import
+
+logger = logging.getLogger(__name__)
+
+cv2 = lazy_import("cv2")
+
+def _face_region(image, box):
+    """Area wajah (bounding box ternormalisasi) dari frame, atau frame penuh jika box tidak ada."""
+    if box is None:
+        return image
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = box
+    left, top = max(0, int(x0 * width)), max(0, int(y0 * height))
+    right, bottom = min(width, int(x1 * width) + 1), min(height, int(y1 * height) + 1)
+    if right - left < 2 or bottom - top < 2:
+        return image
+    return image[top:bottom, left:right]
+
+def dhash(image, hash_size=FRAME_CACHE_HASH_SIZE):
+    """Difference hash grayscale: perbandingan piksel bertetangga pada gambar (hash_size+1) x hash_size."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count("1")
+
+class FrameResultCache:
+    """
+    Cache hasil analisis per sesi. Hash dihitung pada area wajah dari frame
+    terakhir yang dianalisis, sehingga gerakan kecil seperti membuka mulut tetap
+    mengubah hash, sementara frame yang hampir identik mengembalikan hasil lama.
+    """
+
+    def __init__(self, hamming_threshold=FRAME_CACHE_HAMMING_THRESHOLD,
+                 max_age_seconds=FRAME_CACHE_MAX_AGE_SECONDS, max_sessions=FRAME_CACHE_MAX_SESSIONS):
+        self.hamming_threshold = hamming_threshold
+        self.max_age_seconds = max_age_seconds
+        self.max_sessions = max(1, int(max_sessions))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, session_key, image):
+        """Mengembalikan salinan hasil cache jika frame hampir identik dengan frame terakhir yang dianalisis."""
+        with self._lock:
+            entry = self._entries.get(session_key)
+        if entry is not None:
+            box, frame_hash, result, stored_at = entry
+            if time.monotonic() - stored_at <= self.max_age_seconds:
+                if hamming_distance(dhash(_face_region(image, box)), frame_hash) <= self.hamming_threshold:
+                    with self._lock:
+                        self.hits += 1
+                    return dict(result)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, session_key, image, result):
+        box = result.get("face_box")
+        entry = (box, dhash(_face_region(image, box)), dict(result), time.monotonic())
+        with self._lock:
+            self._entries[session_key] = entry
+            self._entries.move_to_end(session_key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def discard(self, session_key):
+        with self._lock:
+            self._entries.pop(session_key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "sessions": len(self._entries)
+            }
@@ -0,0 +1,46 @@
+# detectors/frame_decoder.py
+import base64
+import binascii
+import logging
+import os
+
+import numpy as np
+
+from lazy_loader import lazy_import
+
+logger = logging.getLogger(__name__)
+
+cv2 = lazy_import("cv2")
+
+def decode_frame_bytes(data):
+    """Decode JPEG/PNG bytes langsung di memori menjadi array BGR (tanpa file temporer)."""
+    if not data:
+        return None
+    np_arr = np.frombuffer(data, np.uint8)
+    return cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+
+def decode_base64_frame(frame_base64):
+    """Decode frame base64 dari klien menjadi array BGR. Mengembalikan None jika tidak valid."""
+    try:
+        img_data = base64.b64decode(frame_base64)
+    except (binascii.Error, TypeError, ValueError) as e:
+        logger.warning(f"Invalid base64 frame data: {e}")
+        return None
+    return decode_frame_bytes(img_data)
+
+def load_image(source):
+    """
+    Menerima ndarray BGR yang sudah di-decode, bytes gambar mentah, atau path file
+    (untuk kompatibilitas lama) dan mengembalikan array BGR atau None.
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return decode_frame_bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        if not os.path.exists(source):
+            logger.warning(f"Image not found at {source}")
+            return None
+        return cv2.imread(os.fspath(source))
+    logger.warning(f"Unsupported image source type: {type(source).__name__}")
+    return None
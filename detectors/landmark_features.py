@@ -0,0 +1,124 @@
+# detectors/landmark_features.py
+import numpy as np
+
+# Indeks landmark FaceMesh yang dipakai oleh detektor
+NOSE_TIP = 4
+FACE_LEFT, FACE_RIGHT = 454, 234
+LIP_TOP, LIP_BOTTOM = 13, 14
+MOUTH_LEFT, MOUTH_RIGHT = 61, 291
+LEFT_EYE_OUTER, LEFT_EYE_INNER = 33, 133
+RIGHT_EYE_OUTER, RIGHT_EYE_INNER = 263, 362
+LEFT_EYE_TOP, LEFT_EYE_BOTTOM = 159, 145
+RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM = 386, 374
+LEFT_INNER_BROW, RIGHT_INNER_BROW = 107, 336
+
+# Pasangan landmark yang jarak pikselnya dihitung sekaligus dengan fancy indexing
+DISTANCE_PAIRS = np.array([
+    (LEFT_EYE_INNER, RIGHT_EYE_INNER),    # 0: jarak antar mata (normalisasi)
+    (LIP_TOP, LIP_BOTTOM),                # 1: tinggi mulut
+    (MOUTH_LEFT, MOUTH_RIGHT),            # 2: lebar mulut
+    (LEFT_EYE_TOP, LEFT_EYE_BOTTOM),      # 3: tinggi mata kiri
+    (LEFT_EYE_OUTER, LEFT_EYE_INNER),     # 4: lebar mata kiri
+    (RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM),    # 5: tinggi mata kanan
+    (RIGHT_EYE_OUTER, RIGHT_EYE_INNER),   # 6: lebar mata kanan
+])
+
+FEATURE_NAMES = (
+    "tilt_ratio",          # asimetri hidung terhadap sisi wajah (pose)
+    "mouth_open_ratio",    # jarak bibir vertikal / jarak mata horizontal (mulut)
+    "mouth_width",         # lebar mulut ternormalisasi (ambang dinamis mulut)
+    "mouth_aspect_ratio",  # tinggi / lebar mulut (ekspresi)
+    "mouth_corner_lift",   # sudut bibir terangkat (+) atau turun (-)
+    "eye_aspect_ratio",    # rata-rata EAR kedua mata
+    "brow_height",         # tinggi alis dinormalisasi jarak antar mata
+    "lip_distance",        # jarak bibir ternormalisasi (emosi)
+)
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+
+EPSILON = 1e-6
+
+def landmarks_to_array(landmarks):
+    """Konversi landmark MediaPipe menjadi array float32 (N, 3) sekali per frame."""
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+
+def extract_features(points, image_shape):
+    """
+    Menghitung semua fitur geometris dari array landmark (N, 3) atau batch (B, N, 3).
+    image_shape adalah (H, W, ...) untuk satu frame, atau array (B, 2) berisi (H, W)
+    per frame untuk batch. Mengembalikan array float32 (..., len(FEATURE_NAMES)).
+    """
+    points = np.asarray(points, dtype=np.float32)
+    if points.ndim == 2:
+        size = np.asarray(image_shape[:2], dtype=np.float32)
+    else:
+        size = np.asarray(image_shape, dtype=np.float32)[..., :2]
+    height = size[..., 0]
+    width = size[..., 1]
+    x = points[..., 0]
+    y = points[..., 1]
+
+    # Semua jarak piksel dalam satu operasi: (..., len(DISTANCE_PAIRS))
+    pixels = points[..., :2] * np.stack([width, height], axis=-1)[..., None, :]
+    distances = np.linalg.norm(
+        pixels[..., DISTANCE_PAIRS[:, 0], :] - pixels[..., DISTANCE_PAIRS[:, 1], :], axis=-1
+    )
+    inter_eye = distances[..., 0]
+    inter_eye = np.where(inter_eye == 0, 1.0, inter_eye)
+
+    left_diff = np.abs(x[..., NOSE_TIP] - x[..., FACE_LEFT])
+    right_diff = np.abs(x[..., NOSE_TIP] - x[..., FACE_RIGHT])
+    tilt_ratio = np.abs(left_diff - right_diff) / np.maximum(np.maximum(left_diff, right_diff), EPSILON)
+
+    lip_distance = np.abs(y[..., LIP_TOP] - y[..., LIP_BOTTOM])
+    eye_distance = np.abs(x[..., LEFT_EYE_OUTER] - x[..., RIGHT_EYE_OUTER]) * width
+    mouth_open_ratio = lip_distance * height / np.maximum(eye_distance, EPSILON)
+    mouth_width = np.abs(x[..., MOUTH_RIGHT] - x[..., MOUTH_LEFT])
+
+    mouth_aspect_ratio = distances[..., 1] / (distances[..., 2] + EPSILON)
+    mouth_corner_lift = (
+        (y[..., LIP_TOP] + y[..., LIP_BOTTOM]) / 2 - (y[..., MOUTH_LEFT] + y[..., MOUTH_RIGHT]) / 2
+    )
+    ear_left = distances[..., 3] / (distances[..., 4] + EPSILON)
+    ear_right = distances[..., 5] / (distances[..., 6] + EPSILON)
+    eye_aspect_ratio = (ear_left + ear_right) / 2
+
+    left_brow_height = (y[..., LEFT_EYE_TOP] - y[..., LEFT_INNER_BROW]) * height
+    right_brow_height = (y[..., RIGHT_EYE_TOP] - y[..., RIGHT_INNER_BROW]) * height
+    brow_height = ((left_brow_height + right_brow_height) / 2) / (inter_eye + EPSILON)
+
+    return np.stack([
+        tilt_ratio, mouth_open_ratio, mouth_width, mouth_aspect_ratio,
+        mouth_corner_lift, eye_aspect_ratio, brow_height, lip_distance
+    ], axis=-1).astype(np.float32)
+
+def feature_dict(features):
+    """Vektor fitur satu frame -> dict {nama_fitur: nilai} untuk dipakai aturan klasifikasi."""
+    return {name: float(features[index]) for index, name in enumerate(FEATURE_NAMES)}
+
+# Subset landmark (mulut, mata, alis, hidung, kontur) untuk classifier ekspresi terlatih
+CLASSIFIER_LANDMARKS = np.array([
+    61, 291, 13, 14, 0, 17, 78, 308,          # mulut
+    33, 133, 159, 145, 263, 362, 386, 374,    # mata
+    70, 105, 107, 336, 334, 300,              # alis
+    1, 4, 152, 234, 454, 10,                  # hidung, dagu, sisi wajah, dahi
+])
+
+def normalized_landmarks(points):
+    """
+    Koordinat 2D CLASSIFIER_LANDMARKS yang dinormalisasi terhadap pose wajah:
+    digeser ke titik tengah kedua sudut mata dalam, diputar agar garis mata
+    horizontal, dan diskalakan dengan jarak antar mata. Menerima (N, 3) atau
+    (B, N, 3); mengembalikan float32 (..., 2 * len(CLASSIFIER_LANDMARKS)).
+    """
+    points = np.asarray(points, dtype=np.float32)[..., :2]
+    left_eye = points[..., LEFT_EYE_INNER, :]
+    right_eye = points[..., RIGHT_EYE_INNER, :]
+    center = (left_eye + right_eye) / 2
+    axis = right_eye - left_eye
+    scale = np.maximum(np.linalg.norm(axis, axis=-1, keepdims=True), EPSILON)
+    cos, sin = (axis / scale)[..., 0:1], (axis / scale)[..., 1:2]
+
+    selected = points[..., CLASSIFIER_LANDMARKS, :] - center[..., None, :]
+    x, y = selected[..., 0], selected[..., 1]
+    aligned = np.stack([x * cos + y * sin, y * cos - x * sin], axis=-1) / scale[..., None]
+    return aligned.reshape(*aligned.shape[:-2], -1).astype(np.float32)
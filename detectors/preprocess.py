@@ -0,0 +1,58 @@
+# detectors/preprocess.py
+import numpy as np
+
+from config import FRAME_TARGET_MAX_SIDE, FACE_ROI_MARGIN
+from lazy_loader import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Ukuran minimum crop (piksel) agar FaceMesh masih punya cukup detail
+MIN_ROI_SIDE = 64
+
+def downscale_frame(image, max_side=FRAME_TARGET_MAX_SIDE, interpolation=None):
+    """
+    Mengecilkan frame (menjaga aspect ratio) sehingga sisi terpanjangnya <= max_side.
+    Default INTER_AREA (kualitas terbaik); INTER_LINEAR jauh lebih murah untuk
+    gambar kecil yang hanya dipakai deteksi kasar.
+    """
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return image
+    scale = max_side / longest
+    return cv2.resize(
+        image, (max(1, round(width * scale)), max(1, round(height * scale))),
+        interpolation=cv2.INTER_AREA if interpolation is None else interpolation
+    )
+
+def landmarks_bbox(points):
+    """Bounding box wajah ternormalisasi (x0, y0, x1, y1) dari array landmark (N, 3)."""
+    x0, y0 = points[:, :2].min(axis=0)
+    x1, y1 = points[:, :2].max(axis=0)
+    return (float(x0), float(y0), float(x1), float(y1))
+
+def crop_to_roi(image, roi, margin=FACE_ROI_MARGIN):
+    """
+    Memotong frame ke bounding box wajah sebelumnya ditambah margin.
+    Mengembalikan (crop, (x0, y0)) dalam piksel, atau (None, None) jika ROI tidak layak.
+    """
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = roi
+    pad_x = (x1 - x0) * margin
+    pad_y = (y1 - y0) * margin
+    left = max(0, int((x0 - pad_x) * width))
+    top = max(0, int((y0 - pad_y) * height))
+    right = min(width, int((x1 + pad_x) * width) + 1)
+    bottom = min(height, int((y1 + pad_y) * height) + 1)
+    if right - left < MIN_ROI_SIDE or bottom - top < MIN_ROI_SIDE:
+        return None, None
+    return image[top:bottom, left:right], (left, top)
+
+def remap_landmarks(points, origin, crop_shape, frame_shape):
+    """Mengubah array landmark (N, 3) ternormalisasi terhadap crop menjadi ternormalisasi terhadap frame penuh."""
+    left, top = origin
+    crop_h, crop_w = crop_shape[:2]
+    frame_h, frame_w = frame_shape[:2]
+    scale = np.array([crop_w / frame_w, crop_h / frame_h, crop_w / frame_w], dtype=np.float32)
+    offset = np.array([left / frame_w, top / frame_h, 0.0], dtype=np.float32)
+    return points * scale + offset
@@ -0,0 +1,242 @@
+# detectors/runtime.py
+import itertools
+import logging
+import math
+import multiprocessing
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import (
+    DETECTOR_BACKEND, DETECTOR_WORKERS, DETECTOR_TIMEOUT_SECONDS, DETECTOR_MAX_QUEUE_DEPTH,
+    DETECTOR_LATENCY_EWMA_ALPHA, FRAME_INTERVAL_MIN_MS, FRAME_INTERVAL_MAX_MS
+)
+from detectors.face_analyzer import analyze_face, get_face_mesh
+from detectors.frame_cache import FrameResultCache
+from detectors.frame_decoder import load_image
+from detectors.session_trackers import analyze_tracked_face, analyze_tracked_faces, release_tracker
+from lazy_loader import register_warmup
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("thread", "process")
+
+def _warm_worker():
+    """Inisialisasi FaceMesh di thread/proses worker agar request pertama tidak membayar biaya load model."""
+    return get_face_mesh() is not None
+
+class DetectorRuntime:
+    """
+    Memegang siklus hidup model detektor dan mendistribusikan analisis frame ke
+    sekumpulan worker.
+
+    - backend "thread": ThreadPoolExecutor, setiap thread memegang FaceMesh
+      thread-local sendiri sehingga analisis tidak saling menunggu.
+    - backend "process": sekumpulan proses worker yang di-warmup di awal, setiap
+      proses memegang FaceMesh sendiri sehingga analisis memakai semua core.
+
+    Frame dengan session_key dianalisis oleh tracker FaceMesh mode video milik
+    sesi tersebut. Pada backend "process", tracker hidup di dalam proses worker,
+    jadi satu sesi selalu diarahkan ke proses (shard) yang sama. Untuk frame
+    bersesi, frame yang hampir identik dengan frame terakhir yang dianalisis
+    langsung dijawab dari FrameResultCache tanpa menjalankan detektor.
+
+    Runtime juga mencatat jumlah frame yang sedang antre/diproses dan EWMA
+    latensi per frame; load_status() menurunkan rekomendasi interval frame
+    berikutnya untuk klien dan status jenuh (saturated) untuk backpressure.
+    """
+
+    def __init__(self, backend=DETECTOR_BACKEND, workers=DETECTOR_WORKERS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown detector backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.workers = max(1, int(workers))
+
+        if backend == "process":
+            # Satu executor berproses-tunggal per shard agar afinitas sesi terjaga.
+            # 'spawn' agar worker tidak mewarisi state graph MediaPipe dari proses induk.
+            context = multiprocessing.get_context("spawn")
+            self._shards = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_warm_worker)
+                for _ in range(self.workers)
+            ]
+        else:
+            self._shards = [ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="detector",
+                initializer=_warm_worker
+            )]
+        self._round_robin = itertools.cycle(range(len(self._shards)))
+        self._round_robin_lock = threading.Lock()
+        self.frame_cache = FrameResultCache()
+        self.max_queue_depth = DETECTOR_MAX_QUEUE_DEPTH or self.workers * 4
+        self._in_flight = 0
+        self._admitted = 0
+        self._latency_ewma = None
+        self._load_lock = threading.Lock()
+        logger.info(f"Detector runtime started with '{backend}' backend and {self.workers} worker(s).")
+
+    def _executor_for(self, session_key=None):
+        if len(self._shards) == 1:
+            return self._shards[0]
+        if session_key is not None:
+            return self._shards[zlib.crc32(str(session_key).encode()) % len(self._shards)]
+        with self._round_robin_lock:
+            return self._shards[next(self._round_robin)]
+
+    def _track(self, future, frames=1):
+        """Mencatat frame yang masuk antrean dan memperbarui EWMA latensi saat selesai."""
+        started = time.monotonic()
+        with self._load_lock:
+            self._in_flight += frames
+        future.add_done_callback(lambda done: self._untrack(started, frames))
+        return future
+
+    def _untrack(self, started, frames):
+        # Latensi per frame termasuk waktu tunggu di antrean
+        latency = (time.monotonic() - started) / frames
+        with self._load_lock:
+            self._in_flight -= frames
+            if self._latency_ewma is None:
+                self._latency_ewma = latency
+            else:
+                alpha = DETECTOR_LATENCY_EWMA_ALPHA
+                self._latency_ewma = alpha * latency + (1 - alpha) * self._latency_ewma
+
+    def try_admit(self):
+        """
+        Mendaftarkan satu request frame yang akan dianalisis. Mengembalikan False
+        jika request + frame dalam antrean sudah mencapai max_queue_depth, sehingga
+        pemanggil bisa menolak request sebelum men-decode frame.
+        """
+        with self._load_lock:
+            if max(self._admitted, self._in_flight) >= self.max_queue_depth:
+                return False
+            self._admitted += 1
+            return True
+
+    def release_admission(self):
+        with self._load_lock:
+            self._admitted -= 1
+
+    def load_status(self):
+        """
+        Kondisi beban saat ini: frame dalam antrean, EWMA latensi, rekomendasi
+        interval frame berikutnya (ms) untuk klien, dan apakah runtime jenuh
+        beserta Retry-After (detik) yang disarankan.
+        """
+        with self._load_lock:
+            in_flight = max(self._admitted, self._in_flight)
+            latency = self._latency_ewma or 0.0
+        # Satu klien idealnya mengirim frame berikutnya setelah frame sebelumnya selesai.
+        # EWMA latensi sudah mencakup waktu tunggu di antrean, jadi tidak dikalikan lagi dengan kedalaman antrean
+        interval_ms = latency * 1000
+        interval_ms = min(max(interval_ms, FRAME_INTERVAL_MIN_MS), FRAME_INTERVAL_MAX_MS)
+        saturated = in_flight >= self.max_queue_depth
+        return {
+            "in_flight": in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": round(latency * 1000, 1),
+            "next_frame_interval_ms": int(interval_ms),
+            "saturated": saturated,
+            "retry_after_seconds": max(1, math.ceil(latency)) if saturated else 0
+        }
+
+    def submit(self, frame, session_key=None):
+        """
+        Menjadwalkan analisis satu frame (ndarray, bytes, atau path). Mengembalikan Future.
+        Jika session_key diberikan, frame dianalisis dengan tracker sesi tersebut
+        atau dijawab dari cache jika hampir identik dengan frame sebelumnya.
+        """
+        if session_key is None:
+            return self._track(self._executor_for().submit(analyze_face, frame))
+
+        frame = load_image(frame)
+        if frame is not None:
+            cached = self.frame_cache.lookup(session_key, frame)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+        future = self._track(self._executor_for(session_key).submit(analyze_tracked_face, frame, session_key))
+        if frame is not None:
+            future.add_done_callback(lambda done: self._cache_result(session_key, frame, done))
+        return future
+
+    def _cache_result(self, session_key, frame, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.frame_cache.store(session_key, frame, future.result())
+
+    def analyze(self, frame, session_key=None, timeout=DETECTOR_TIMEOUT_SECONDS):
+        """Menganalisis satu frame dan menunggu hasilnya."""
+        return self.submit(frame, session_key=session_key).result(timeout=timeout)
+
+    def analyze_many(self, frames, session_key=None, timeout=DETECTOR_TIMEOUT_SECONDS):
+        """
+        Menganalisis sekumpulan frame dan mengembalikan hasil sesuai urutan input.
+        Tanpa session_key, frame disebar ke semua worker; dengan session_key, frame
+        yang tidak terjawab cache diproses berurutan oleh tracker sesi agar
+        tracking tetap konsisten.
+        """
+        if session_key is None:
+            futures = [self.submit(frame) for frame in frames]
+            return [future.result(timeout=timeout) for future in futures]
+
+        frames = [load_image(frame) for frame in frames]
+        results = [
+            self.frame_cache.lookup(session_key, frame) if frame is not None else None
+            for frame in frames
+        ]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            future = self._track(self._executor_for(session_key).submit(
+                analyze_tracked_faces, [frames[index] for index in pending], session_key
+            ), frames=len(pending))
+            for index, result in zip(pending, future.result(timeout=timeout)):
+                results[index] = result
+            last = pending[-1]
+            if frames[last] is not None:
+                self.frame_cache.store(session_key, frames[last], results[last])
+        return results
+
+    def release_session(self, session_key):
+        """Membebaskan tracker dan cache frame sesi (mis. saat sesi wawancara berakhir)."""
+        self.frame_cache.discard(session_key)
+        return self._executor_for(session_key).submit(release_tracker, session_key)
+
+    def warmup(self):
+        """Memaksa semua worker dibuat dan memuat FaceMesh sebelum menerima traffic."""
+        futures = [
+            shard.submit(_warm_worker)
+            for shard in self._shards
+            for _ in range(self.workers if self.backend == "thread" else 1)
+        ]
+        return all(future.result() for future in futures)
+
+    def shutdown(self, wait=True):
+        for shard in self._shards:
+            shard.shutdown(wait=wait)
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+def get_detector_runtime():
+    """Mengembalikan runtime detektor global, membuatnya saat pertama kali dipakai."""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                runtime = DetectorRuntime()
+                if runtime.backend == "process":
+                    runtime.warmup()
+                _runtime = runtime
+    return _runtime
+
+def warmup_detector_runtime():
+    """Hook warmup: membuat runtime dan memuat FaceMesh di semua worker."""
+    return get_detector_runtime().warmup()
+
+register_warmup("detector_runtime", warmup_detector_runtime)
@@ -0,0 +1,106 @@
+# detectors/session_trackers.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import TRACKER_MAX_SESSIONS, TRACKER_IDLE_TTL_SECONDS
+from detectors.face_analyzer import analyze_face, create_face_mesh
+
+logger = logging.getLogger(__name__)
+
+class SessionTracker:
+    """FaceMesh mode video (static_image_mode=False) yang terikat ke satu sesi wawancara."""
+
+    def __init__(self, session_key):
+        self.session_key = session_key
+        self.face_mesh = create_face_mesh(static_image_mode=False)
+        # FaceMesh tidak thread-safe dan tracking butuh frame berurutan
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.closed = False
+        # Bounding box wajah terakhir, dipakai untuk crop ROI pada frame berikutnya
+        self.roi = None
+
+    def close(self):
+        self.closed = True
+        try:
+            self.face_mesh.close()
+        except Exception as e:
+            logger.warning(f"Failed to close FaceMesh tracker for session {self.session_key}: {e}")
+
+class SessionTrackerRegistry:
+    """Menyimpan tracker per sesi dengan eviksi LRU (kapasitas) dan TTL (sesi idle)."""
+
+    def __init__(self, max_sessions=TRACKER_MAX_SESSIONS, idle_ttl_seconds=TRACKER_IDLE_TTL_SECONDS):
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._trackers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, session_key):
+        """Mengembalikan tracker untuk sesi, membuatnya jika belum ada."""
+        evicted = []
+        with self._lock:
+            now = time.monotonic()
+            tracker = self._trackers.get(session_key)
+            if tracker is None:
+                tracker = SessionTracker(session_key)
+                self._trackers[session_key] = tracker
+                logger.debug(f"Created FaceMesh tracker for session {session_key}.")
+            else:
+                self._trackers.move_to_end(session_key)
+            tracker.last_used = now
+
+            # Urutan OrderedDict = urutan LRU, jadi cukup periksa dari depan
+            while self._trackers:
+                oldest_key, oldest = next(iter(self._trackers.items()))
+                if oldest_key == session_key:
+                    break
+                if len(self._trackers) <= self.max_sessions and now - oldest.last_used < self.idle_ttl_seconds:
+                    break
+                evicted.append(self._trackers.pop(oldest_key))
+
+        for stale in evicted:
+            logger.debug(f"Evicted FaceMesh tracker for session {stale.session_key}.")
+            with stale.lock:
+                stale.close()
+        return tracker
+
+    def discard(self, session_key):
+        with self._lock:
+            tracker = self._trackers.pop(session_key, None)
+        if tracker:
+            with tracker.lock:
+                tracker.close()
+        return tracker is not None
+
+    def __len__(self):
+        return len(self._trackers)
+
+_registry = SessionTrackerRegistry()
+
+def get_tracker_registry():
+    return _registry
+
+def analyze_tracked_faces(images, session_key):
+    """Menganalisis frame-frame berurutan dari satu sesi memakai tracker sesi tersebut."""
+    while True:
+        tracker = _registry.acquire(session_key)
+        with tracker.lock:
+            # Tracker bisa saja dievict di antara acquire() dan lock; ambil ulang jika begitu
+            if tracker.closed:
+                continue
+            results = []
+            for image in images:
+                result = analyze_face(image, face_mesh=tracker.face_mesh, roi=tracker.roi)
+                tracker.roi = result.get("face_box")
+                results.append(result)
+            tracker.last_used = time.monotonic()
+        return results
+
+def analyze_tracked_face(image, session_key):
+    return analyze_tracked_faces([image], session_key)[0]
+
+def release_tracker(session_key):
+    return _registry.discard(session_key)
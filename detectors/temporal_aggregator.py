@@ -0,0 +1,140 @@
+# detectors/temporal_aggregator.py
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import ANALYSIS_WINDOW_FRAMES, ANALYSIS_WINDOW_SECONDS, ANALYSIS_WINDOW_MAX_SESSIONS
+from detectors.landmark_features import FEATURE_NAMES
+
+# Kosakata label tiap kategori; label di luar daftar dipetakan ke entri terakhir (tidak terdeteksi)
+LABELS = {
+    "pose": ("lurus", "miring", "unknown"),
+    "mouth": ("bicara", "diam"),
+    "expression": ("senang", "netral", "gugup", "sedih", "marah", "terkejut", "tidak terdeteksi"),
+}
+CATEGORIES = tuple(LABELS)
+_LABEL_CODES = {
+    category: {label: code for code, label in enumerate(labels)}
+    for category, labels in LABELS.items()
+}
+
+class SessionWindow:
+    """Ring buffer NumPy berisi label dan fitur mentah dari frame-frame terakhir satu sesi."""
+
+    def __init__(self, capacity=ANALYSIS_WINDOW_FRAMES):
+        self.capacity = max(1, int(capacity))
+        self.labels = np.zeros((self.capacity, len(CATEGORIES)), dtype=np.int8)
+        self.features = np.full((self.capacity, len(FEATURE_NAMES)), np.nan, dtype=np.float32)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.count = 0
+        self.head = 0
+        self.last_updated = 0.0
+
+    def push(self, result, timestamp=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        for column, category in enumerate(CATEGORIES):
+            codes = _LABEL_CODES[category]
+            self.labels[self.head, column] = codes.get(result.get(category), len(codes) - 1)
+        features = result.get("features")
+        self.features[self.head] = np.nan if features is None else features
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.last_updated = max(self.last_updated, timestamp)
+
+    def snapshot(self, max_age_seconds=ANALYSIS_WINDOW_SECONDS, now=None):
+        """Label hasil smoothing (mayoritas), distribusi label, dan rata-rata fitur dalam jendela."""
+        now = time.monotonic() if now is None else now
+        valid = self.timestamps[:self.count] >= now - max_age_seconds
+        labels = self.labels[:self.count][valid]
+        features = self.features[:self.count][valid]
+        frames = int(labels.shape[0])
+
+        summary = {"frames": frames}
+        for column, category in enumerate(CATEGORIES):
+            names = LABELS[category]
+            counts = np.bincount(labels[:, column], minlength=len(names)) if frames else np.zeros(len(names))
+            summary[category] = {
+                "smoothed": names[int(np.argmax(counts))] if frames else None,
+                "distribution": {
+                    names[code]: round(float(count) / frames, 3)
+                    for code, count in enumerate(counts) if count
+                }
+            }
+
+        face_rows = features[~np.isnan(features).any(axis=1)]
+        summary["face_frames"] = int(face_rows.shape[0])
+        summary["features_mean"] = (
+            {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, face_rows.mean(axis=0))}
+            if face_rows.shape[0] else None
+        )
+        return summary
+
+def align_client_timestamps(client_timestamps, now=None):
+    """
+    Memetakan timestamp klien (milidetik, mis. Date.now()) ke jam time.monotonic()
+    server: frame terbaru dianggap tiba sekarang dan frame lain mundur sesuai
+    selisihnya. Frame tanpa timestamp numerik memakai waktu tiba.
+    """
+    now = time.monotonic() if now is None else now
+    numeric = [
+        value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+        for value in client_timestamps
+    ]
+    present = [value for value in numeric if value is not None]
+    newest = max(present) if present else None
+    return [now if value is None else now - (newest - value) / 1000.0 for value in numeric]
+
+class TemporalAggregator:
+    """Menyimpan SessionWindow per sesi dengan batas jumlah sesi (LRU)."""
+
+    def __init__(self, max_sessions=ANALYSIS_WINDOW_MAX_SESSIONS):
+        self.max_sessions = max(1, int(max_sessions))
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def push(self, session_key, results, timestamp=None):
+        """
+        Menambahkan satu atau beberapa hasil analisis frame ke jendela sesi.
+        timestamp (jam time.monotonic()) boleh berupa list, satu per hasil.
+        """
+        if isinstance(results, dict):
+            results = [results]
+        timestamps = timestamp if isinstance(timestamp, (list, tuple)) else [timestamp] * len(results)
+        with self._lock:
+            window = self._windows.get(session_key)
+            if window is None:
+                window = self._windows[session_key] = SessionWindow()
+            self._windows.move_to_end(session_key)
+            while len(self._windows) > self.max_sessions:
+                self._windows.popitem(last=False)
+            for result, result_timestamp in zip(results, timestamps):
+                window.push(result, result_timestamp)
+
+    def snapshot(self, session_key):
+        with self._lock:
+            window = self._windows.get(session_key)
+            return window.snapshot() if window is not None else None
+
+    def fresh_snapshot(self, session_key, max_age_seconds, now=None):
+        """
+        Snapshot jendela sesi hanya jika frame terakhirnya masuk tidak lebih dari
+        max_age_seconds yang lalu; None jika jendela kosong atau sudah basi.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            window = self._windows.get(session_key)
+            if window is None or not window.count or now - window.last_updated > max_age_seconds:
+                return None
+            return window.snapshot(now=now)
+
+    def reset(self, session_key):
+        with self._lock:
+            self._windows.pop(session_key, None)
+
+_aggregator = TemporalAggregator()
+
+def get_temporal_aggregator():
+    return _aggregator
@@ -3,6 +3,7 @@ from flask_bcrypt import Bcrypt
 from flask_mail import Mail
 from flask_cors import CORS
 from flask_login import LoginManager # <--- NEW
+from flask_sock import Sock
 # from database import get_collections # <--- HAPUS BARIS INI!
 
 # Impor logging di sini agar logger bisa digunakan
@@ -13,6 +14,7 @@ bcrypt = Bcrypt()
 mail = Mail()
 cors = CORS()
 login_manager = LoginManager() # <--- NEW
+sock = Sock() # WebSocket routes (streaming analisis frame)
 
 # Configure Flask-Login settings (optional, but good practice)
 login_manager.login_view = 'web_auth_bp.web_login' # Redirect to this view if login_required fails
@@ -72,5 +74,6 @@ def init_extensions(app):
     bcrypt.init_app(app)
     mail.init_app(app)
     login_manager.init_app(app)
+    sock.init_app(app)
     # CORS is typically initialized with the app instance itself or a blueprint
     # app.py will handle CORS init directly.
\ No newline at end of file
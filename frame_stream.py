@@ -0,0 +1,38 @@
+# frame_stream.py
+import threading
+
+class LatestFrameSlot:
+    """
+    Antrian berkapasitas satu untuk stream frame. Frame baru menimpa frame yang
+    belum sempat dianalisis, sehingga saat server tertinggal, frame basi dibuang
+    dan analisis berikutnya selalu memakai frame terbaru dari klien.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._condition:
+            self.received += 1
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._condition.notify()
+
+    def get(self):
+        """Menunggu dan mengambil frame terbaru. Mengembalikan None jika slot sudah ditutup."""
+        with self._condition:
+            while self._item is None and not self._closed:
+                self._condition.wait()
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._item = None
+            self._condition.notify_all()
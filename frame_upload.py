@@ -0,0 +1,122 @@
+# frame_upload.py
+from collections import namedtuple
+from functools import wraps
+import logging
+
+from flask import request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config import MAX_FRAME_UPLOAD_BYTES
+from detectors.frame_decoder import decode_base64_frame, decode_frame_bytes
+from detectors.runtime import get_detector_runtime
+
+logger = logging.getLogger(__name__)
+
+# Content-Type body mentah yang diperlakukan sebagai satu frame gambar
+RAW_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp", "application/octet-stream")
+
+# Base64 membesarkan data 4/3 kali; ditambah ruang untuk field JSON lain
+BASE64_OVERHEAD = 4 / 3
+JSON_FIELDS_ALLOWANCE = 64 * 1024
+
+# fields: dict field non-frame, frame: ndarray BGR atau None,
+# provided: True jika klien mengirim field/body frame (meski kosong atau gagal di-decode)
+FrameUpload = namedtuple("FrameUpload", ["fields", "frame", "provided"])
+
+class FrameUploadError(Exception):
+    """Request frame ditolak sebelum di-decode (mis. melebihi batas ukuran)."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def max_request_bytes(frame_count=1):
+    """Batas Content-Length untuk request JSON berisi `frame_count` frame base64."""
+    return int(MAX_FRAME_UPLOAD_BYTES * BASE64_OVERHEAD * frame_count) + JSON_FIELDS_ALLOWANCE
+
+def _check_content_length(limit):
+    if request.content_length is not None and request.content_length > limit:
+        raise FrameUploadError(f"Ukuran request melebihi batas {limit} byte.", 413)
+    # Upload tanpa Content-Length (chunked) dipotong Werkzeug di batas yang sama saat dibaca
+    request.max_content_length = limit
+
+def read_json_body(limit):
+    """Body JSON (atau None) dengan batas `limit` byte; melempar FrameUploadError 413 jika terlampaui."""
+    _check_content_length(limit)
+    try:
+        return request.get_json(silent=True)
+    except RequestEntityTooLarge:
+        raise FrameUploadError(f"Ukuran request melebihi batas {limit} byte.", 413)
+
+def _read_limited(stream, limit):
+    data = stream.read(limit + 1)
+    if len(data) > limit:
+        raise FrameUploadError(f"Ukuran frame melebihi batas {limit} byte.", 413)
+    return data
+
+def read_frame_upload(frame_field="frame"):
+    """
+    Membaca satu frame dari request dalam salah satu format:
+      - application/json: {"frame": "<base64>", ...} (format lama, tetap didukung)
+      - multipart/form-data: file `frame` + field form lain
+      - image/jpeg, image/png, application/octet-stream: body mentah adalah frame,
+        field lain (mis. session_id) dikirim lewat query string
+    Body biner dibaca langsung ke buffer dan di-decode tanpa base64/JSON parsing.
+    Melempar FrameUploadError jika body melebihi batas, dengan atau tanpa Content-Length.
+    """
+    try:
+        return _read_frame_upload(frame_field)
+    except RequestEntityTooLarge:
+        raise FrameUploadError("Ukuran request melebihi batas.", 413)
+
+def _read_frame_upload(frame_field):
+    mimetype = request.mimetype
+
+    if mimetype in RAW_IMAGE_TYPES:
+        _check_content_length(MAX_FRAME_UPLOAD_BYTES)
+        data = _read_limited(request.stream, MAX_FRAME_UPLOAD_BYTES)
+        return FrameUpload(request.args.to_dict(), decode_frame_bytes(data), bool(data))
+
+    if mimetype == "multipart/form-data":
+        _check_content_length(MAX_FRAME_UPLOAD_BYTES + JSON_FIELDS_ALLOWANCE)
+        fields = request.form.to_dict()
+        upload = request.files.get(frame_field)
+        if upload is None:
+            # Klien lama bisa saja mengirim frame base64 sebagai field form biasa
+            frame_base64 = fields.pop(frame_field, None)
+            frame = decode_base64_frame(frame_base64) if frame_base64 else None
+            return FrameUpload(fields, frame, frame_base64 is not None)
+        data = _read_limited(upload.stream, MAX_FRAME_UPLOAD_BYTES)
+        return FrameUpload(fields, decode_frame_bytes(data), True)
+
+    fields = read_json_body(max_request_bytes()) or {}
+    frame_base64 = fields.pop(frame_field, None)
+    frame = decode_base64_frame(frame_base64) if frame_base64 else None
+    return FrameUpload(fields, frame, frame_base64 is not None)
+
+def detector_backpressure(f):
+    """
+    Menolak request frame dengan 429 + Retry-After sebelum body dibaca jika
+    antrean runtime detektor sudah penuh, agar latensi per frame tetap terbatas
+    saat lonjakan traffic alih-alih antrean terus memanjang.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        runtime = get_detector_runtime()
+        if not runtime.try_admit():
+            load = runtime.load_status()
+            logger.warning(f"Detector runtime saturated ({load['in_flight']} frames in flight), rejecting frame request.")
+            response = jsonify({
+                "status": "fail",
+                "message": "Server sedang sibuk, kirim frame berikutnya nanti.",
+                "retry_after": load["retry_after_seconds"],
+                "next_frame_interval_ms": load["next_frame_interval_ms"]
+            })
+            response.headers["Retry-After"] = str(load["retry_after_seconds"])
+            return response, 429
+        try:
+            return f(*args, **kwargs)
+        finally:
+            runtime.release_admission()
+    return decorated
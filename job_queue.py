@@ -0,0 +1,185 @@
+# job_queue.py
+import datetime
+import logging
+import os
+import socket
+import threading
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from config import (
+    JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_POLL_INTERVAL_SECONDS, JOB_RETRY_BACKOFF_SECONDS
+)
+from database import get_collections
+
+logger = logging.getLogger(__name__)
+
+# Nama job -> (handler(payload, progress), on_failure(payload, error) atau None)
+_handlers = {}
+_index_ready = False
+# Dibangunkan saat job di-enqueue dari proses yang sama agar worker embedded tidak menunggu interval poll
+_job_available = threading.Event()
+
+def register_job_handler(job_type, handler, on_failure=None):
+    """
+    Mendaftarkan handler untuk satu jenis job. handler(payload, progress) boleh
+    memanggil progress("tahap") untuk melaporkan kemajuan; on_failure dipanggil
+    sekali setelah semua percobaan gagal.
+    """
+    _handlers[job_type] = (handler, on_failure)
+
+def get_jobs_collection():
+    global _index_ready
+    collection = get_collections()["jobs"]
+    if not _index_ready:
+        collection.create_index([("status", 1), ("run_after", 1)])
+        _index_ready = True
+    return collection
+
+def enqueue(job_type, payload, max_attempts=JOB_MAX_ATTEMPTS):
+    """Menyimpan job baru berstatus queued dan mengembalikan ID-nya (string)."""
+    now = datetime.datetime.utcnow()
+    result = get_jobs_collection().insert_one({
+        "type": job_type,
+        "payload": payload,
+        "status": "queued",
+        "progress": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "run_after": now,
+        "locked_until": None,
+        "worker": None
+    })
+    _job_available.set()
+    return str(result.inserted_id)
+
+def get_job(job_id):
+    """Status job yang siap di-serialisasi JSON, atau None."""
+    try:
+        job = get_jobs_collection().find_one({"_id": ObjectId(job_id)})
+    except Exception:
+        return None
+    if job is None:
+        return None
+    return {
+        "job_id": str(job["_id"]),
+        "type": job["type"],
+        "status": job["status"],
+        "progress": job.get("progress"),
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "error": job.get("error"),
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+    }
+
+def claim(worker_id, lease_seconds=JOB_LEASE_SECONDS):
+    """
+    Mengambil satu job secara atomik: job queued yang sudah waktunya, atau job
+    running yang lease-nya habis (worker sebelumnya mati di tengah jalan).
+    """
+    now = datetime.datetime.utcnow()
+    return get_jobs_collection().find_one_and_update(
+        {
+            "type": {"$in": list(_handlers)},
+            "$or": [
+                {"status": "queued", "run_after": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lte": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "worker": worker_id,
+                "locked_until": now + datetime.timedelta(seconds=lease_seconds),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def _update(job_id, fields):
+    fields["updated_at"] = datetime.datetime.utcnow()
+    get_jobs_collection().update_one({"_id": job_id}, {"$set": fields})
+
+def run_job(job):
+    """Menjalankan satu job yang sudah di-claim dan mencatat hasilnya."""
+    handler, on_failure = _handlers[job["type"]]
+
+    def progress(stage):
+        _update(job["_id"], {"progress": stage})
+
+    try:
+        handler(job["payload"], progress)
+    except Exception as e:
+        if job["attempts"] < job["max_attempts"]:
+            logger.warning(f"Job {job['_id']} ({job['type']}) attempt {job['attempts']} failed, retrying: {e}")
+            _update(job["_id"], {
+                "status": "queued",
+                "error": str(e),
+                "locked_until": None,
+                "run_after": datetime.datetime.utcnow() + datetime.timedelta(
+                    seconds=JOB_RETRY_BACKOFF_SECONDS * job["attempts"]
+                )
+            })
+            return False
+        logger.error(f"Job {job['_id']} ({job['type']}) failed after {job['attempts']} attempts: {e}", exc_info=True)
+        _update(job["_id"], {"status": "failed", "progress": "failed", "error": str(e), "locked_until": None})
+        if on_failure is not None:
+            try:
+                on_failure(job["payload"], str(e))
+            except Exception as hook_error:
+                logger.error(f"Failure hook for job {job['_id']} raised: {hook_error}", exc_info=True)
+        return False
+    _update(job["_id"], {"status": "done", "progress": "done", "error": None, "locked_until": None})
+    return True
+
+class JobWorker:
+    """Loop claim -> run_job; menunggu JOB_POLL_INTERVAL_SECONDS saat antrean kosong."""
+
+    def __init__(self, poll_interval=JOB_POLL_INTERVAL_SECONDS, worker_id=None):
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self._stopped = threading.Event()
+
+    def run_once(self):
+        """Memproses satu job jika ada; mengembalikan True jika sebuah job dijalankan."""
+        job = claim(self.worker_id)
+        if job is None:
+            return False
+        logger.info(f"Worker {self.worker_id} running job {job['_id']} ({job['type']}), attempt {job['attempts']}.")
+        run_job(job)
+        return True
+
+    def run_forever(self):
+        logger.info(f"Job worker {self.worker_id} started for job types: {sorted(_handlers)}")
+        while not self._stopped.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} loop error: {e}", exc_info=True)
+            _job_available.wait(self.poll_interval)
+            _job_available.clear()
+
+    def stop(self):
+        self._stopped.set()
+        _job_available.set()
+
+_embedded_worker = None
+_embedded_lock = threading.Lock()
+
+def start_embedded_worker():
+    """Menjalankan JobWorker sebagai thread daemon di proses ini (sekali saja)."""
+    global _embedded_worker
+    with _embedded_lock:
+        if _embedded_worker is None:
+            _embedded_worker = JobWorker()
+            threading.Thread(target=_embedded_worker.run_forever, name="job-worker", daemon=True).start()
+    return _embedded_worker
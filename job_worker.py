@@ -0,0 +1,28 @@
+# job_worker.py
+"""
+Worker antrean job (job_queue.py) sebagai proses terpisah, agar worker web
+tidak tertahan panggilan LLM yang lambat saat finalisasi sesi. Proses ini
+juga menjalankan refresher question bank (jika QUESTION_BANK_ENABLED), sehingga
+pool hanya diisi dari satu tempat, bukan dari setiap worker web.
+
+Contoh:
+    gunicorn app:app
+    python job_worker.py
+
+Untuk development satu proses tanpa worker terpisah: JOB_WORKER_EMBEDDED=true python app.py
+"""
+import logging
+
+from config import QUESTION_BANK_ENABLED
+from job_queue import JobWorker
+# Import blueprint mendaftarkan handler job (mis. finalize_session)
+from routes.ai_interview_routes import start_question_bank_refresher
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if QUESTION_BANK_ENABLED:
+        start_question_bank_refresher()
+    JobWorker().run_forever()
+
+if __name__ == "__main__":
+    main()
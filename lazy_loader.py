@@ -0,0 +1,87 @@
+# lazy_loader.py
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class LazyModule:
+    """
+    Proxy untuk modul berat (cv2, mediapipe, google.generativeai, nltk) yang baru
+    di-import saat atributnya pertama kali diakses, sehingga import app.py dan
+    restart worker tidak membayar biaya load library ML/SDK.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    self.load_seconds = time.perf_counter() - started
+                    self._module = module
+                    logger.info(f"Lazy module '{self._name}' loaded in {self.load_seconds:.3f}s.")
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
+
+_modules = {}
+_warmup_hooks = []
+_registry_lock = threading.Lock()
+
+def lazy_import(name):
+    """Mengembalikan proxy LazyModule bersama untuk modul `name`."""
+    with _registry_lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+        return module
+
+def register_warmup(name, hook):
+    """Mendaftarkan fungsi inisialisasi (mis. membuat FaceMesh) yang dijalankan oleh warmup()."""
+    with _registry_lock:
+        _warmup_hooks.append((name, hook))
+
+def warmup():
+    """
+    Memuat semua modul lazy yang terdaftar lalu menjalankan hook warmup.
+    Dipanggil secara eksplisit (mis. WARMUP_ON_STARTUP) saat latensi request
+    pertama lebih penting daripada waktu startup. Mengembalikan durasi per langkah.
+    """
+    timings = {}
+    with _registry_lock:
+        modules = list(_modules.items())
+        hooks = list(_warmup_hooks)
+    for name, module in modules:
+        started = time.perf_counter()
+        module.load()
+        timings[name] = round(time.perf_counter() - started, 4)
+    for name, hook in hooks:
+        started = time.perf_counter()
+        try:
+            hook()
+        except Exception as e:
+            logger.error(f"Warmup hook '{name}' failed: {e}", exc_info=True)
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
+
+def loaded_modules():
+    """Status modul lazy: {nama: durasi load dalam detik, atau None jika belum dimuat}."""
+    with _registry_lock:
+        return {name: module.load_seconds for name, module in _modules.items()}
@@ -0,0 +1,156 @@
+# llm_cache.py
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+from database import get_collections
+
+logger = logging.getLogger(__name__)
+
+def normalize_input(value):
+    """Teks dinormalisasi (spasi dirapatkan, huruf kecil) agar variasi penulisan kecil memakai entri yang sama."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return value
+
+def cache_key(kind, model_name, inputs):
+    payload = json.dumps(
+        {"kind": kind, "model": model_name, "inputs": {name: normalize_input(value) for name, value in inputs.items()}},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    Cache dua tingkat untuk respons LLM: LRU di memori proses, di-backup koleksi
+    Mongo `llm_cache` dengan TTL index pada expires_at sehingga entri dipakai
+    bersama antar worker dan dihapus otomatis oleh Mongo. Nilai harus bisa
+    di-serialisasi BSON (string, list, dict).
+    """
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL_SECONDS, enabled=LLM_CACHE_ENABLED):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._index_ready = False
+        self._stats = {}
+        self.evictions = 0
+
+    def _collection(self):
+        collection = get_collections()["llm_cache"]
+        if not self._index_ready:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    def _count(self, kind, outcome):
+        with self._lock:
+            counters = self._stats.setdefault(kind, {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "errors": 0})
+            counters[outcome] += 1
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, kind, model_name, inputs):
+        """Mengembalikan (nilai, sumber) dengan sumber "memory"/"mongo", atau (None, None) jika miss."""
+        if not self.enabled:
+            return None, None
+        key = cache_key(kind, model_name, inputs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(key)
+                else:
+                    self._entries.pop(key, None)
+                    entry = None
+        if entry is not None:
+            self._count(kind, "memory_hits")
+            return entry[0], "memory"
+
+        try:
+            # TTL monitor Mongo berjalan per menit, jadi expires_at tetap dicek saat membaca
+            document = self._collection().find_one({"_id": key, "expires_at": {"$gt": datetime.datetime.utcnow()}})
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed, calling the model directly: {e}")
+            self._count(kind, "errors")
+            document = None
+        if document is None:
+            self._count(kind, "misses")
+            return None, None
+
+        remaining = (document["expires_at"] - datetime.datetime.utcnow()).total_seconds()
+        self._remember(key, document["value"], time.time() + remaining)
+        self._count(kind, "mongo_hits")
+        return document["value"], "mongo"
+
+    def set(self, kind, model_name, inputs, value, ttl_seconds=None):
+        if not self.enabled:
+            return
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        key = cache_key(kind, model_name, inputs)
+        self._remember(key, value, time.time() + ttl_seconds)
+        now = datetime.datetime.utcnow()
+        try:
+            self._collection().replace_one({"_id": key}, {
+                "_id": key,
+                "kind": kind,
+                "model": model_name,
+                "value": value,
+                "created_at": now,
+                "expires_at": now + datetime.timedelta(seconds=ttl_seconds)
+            }, upsert=True)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            self._count(kind, "errors")
+
+    def get_or_compute(self, kind, model_name, inputs, compute, ttl_seconds=None):
+        """
+        Mengembalikan (nilai, sumber). Saat miss, compute() dipanggil dan hasilnya
+        disimpan; exception dari compute() diteruskan tanpa menyimpan apa pun,
+        sehingga respons yang gagal divalidasi tidak pernah masuk cache.
+        """
+        value, source = self.get(kind, model_name, inputs)
+        if source is not None:
+            return value, source
+        value = compute()
+        self.set(kind, model_name, inputs, value, ttl_seconds)
+        return value, None
+
+    def stats(self):
+        with self._lock:
+            by_kind = {}
+            totals = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "errors": 0}
+            for kind, counters in self._stats.items():
+                lookups = counters["memory_hits"] + counters["mongo_hits"] + counters["misses"]
+                hits = counters["memory_hits"] + counters["mongo_hits"]
+                by_kind[kind] = dict(counters, hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+                for name in totals:
+                    totals[name] += counters[name]
+            lookups = totals["memory_hits"] + totals["mongo_hits"] + totals["misses"]
+            hits = totals["memory_hits"] + totals["mongo_hits"]
+            return dict(
+                totals,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                enabled=self.enabled,
+                entries=len(self._entries),
+                evictions=self.evictions,
+                by_kind=by_kind
+            )
+
+_cache = LLMResponseCache()
+
+def get_llm_cache():
+    return _cache
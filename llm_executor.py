@@ -0,0 +1,53 @@
+# llm_executor.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import LLM_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+def _mark_worker():
+    _worker_state.active = True
+
+def in_llm_worker():
+    """True jika dipanggil dari thread executor LLM (menunggu executor dari sini bisa deadlock)."""
+    return getattr(_worker_state, "active", False)
+
+def get_llm_executor():
+    """
+    Thread pool global untuk panggilan LLM. Ukurannya dibatasi LLM_WORKERS agar
+    lonjakan request tidak membuka koneksi Gemini tanpa batas; panggilan yang
+    melebihi kapasitas menunggu di antrean executor.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=LLM_WORKERS, thread_name_prefix="llm", initializer=_mark_worker
+                )
+                logger.info(f"LLM executor started with {LLM_WORKERS} workers.")
+    return _executor
+
+def submit_timed(fn, *args, **kwargs):
+    """
+    Menjalankan fn(*args, **kwargs) di executor LLM. Future menghasilkan tuple
+    (hasil, timing) dengan timing {"queue_ms": lama menunggu worker,
+    "run_ms": lama fn berjalan}.
+    """
+    submitted = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, {
+            "queue_ms": round((started - submitted) * 1000, 1),
+            "run_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    return get_llm_executor().submit(run)
@@ -0,0 +1,297 @@
+# llm_providers.py
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from config import GEMINI_API_KEY, LLM_PROVIDER, LLM_STUB_LATENCY_MS, LLM_TIMEOUT_SECONDS
+from lazy_loader import lazy_import, register_warmup
+from llm_executor import get_llm_executor, in_llm_worker
+from local_scorer import local_answer_feedback, score_answer
+
+logger = logging.getLogger(__name__)
+
+# Gemini SDK di-import secara lazy: import google.generativeai cukup berat dan
+# tidak perlu dibayar saat startup worker, hanya saat model pertama kali dipakai.
+genai = lazy_import("google.generativeai")
+api_retry = lazy_import("google.api_core.retry")
+
+# Menggunakan model flash yang lebih cepat, cocok untuk interaksi real-time
+GEMINI_MODEL_NAME = 'gemini-1.5-flash-latest'
+
+class LLMError(Exception):
+    """Panggilan LLM gagal; pemanggil boleh memakai fallback lokal."""
+
+class LLMUnavailable(LLMError):
+    """Provider tidak terkonfigurasi (mis. GEMINI_API_KEY kosong)."""
+
+class LLMDeadlineExceeded(LLMError):
+    """Panggilan LLM melewati batas waktunya."""
+
+class LLMProvider(ABC):
+    """
+    Antarmuka provider LLM. Setiap panggilan menyebut `task` (jenis prompt) dan
+    `context` (input terstruktur prompt tersebut); provider jaringan cukup
+    memakai prompt, sedangkan stub lokal membangun jawaban dari context.
+
+    Task yang dipakai: "interview_questions", "answer_feedback",
+    "overall_feedback", dan "batch_feedback" (JSON umpan balik semua jawaban).
+    """
+
+    name = None
+    model_name = None
+
+    def available(self):
+        return True
+
+    def warmup(self):
+        return self.available()
+
+    @abstractmethod
+    def _generate(self, prompt, task, context, json_output, timeout):
+        """Satu panggilan model tanpa batas waktu executor; `timeout` diteruskan ke SDK."""
+
+    def _stream(self, prompt, task, context, timeout):
+        yield self._generate(prompt, task, context, False, timeout)
+
+    def generate(self, prompt, task, context=None, json_output=False, deadline=LLM_TIMEOUT_SECONDS):
+        """
+        Teks respons dengan batas waktu keras `deadline` detik: panggilan
+        dijalankan di executor LLM dan ditinggalkan (LLMDeadlineExceeded) jika
+        melewati batas. Dari thread executor LLM sendiri, panggilan dijalankan
+        langsung dengan timeout SDK agar pool tidak saling menunggu.
+        """
+        if not self.available():
+            raise LLMUnavailable(f"LLM provider {self.name} is not configured.")
+        if in_llm_worker():
+            return self._generate(prompt, task, context or {}, json_output, deadline)
+        future = get_llm_executor().submit(self._generate, prompt, task, context or {}, json_output, deadline)
+        try:
+            return future.result(timeout=deadline)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise LLMDeadlineExceeded(f"{self.name} call for task {task} exceeded {deadline}s.")
+
+    def stream(self, prompt, task, context=None, deadline=LLM_TIMEOUT_SECONDS):
+        """
+        Iterator potongan teks saat dihasilkan. Seluruh stream dibatasi `deadline`
+        detik: setiap potongan ditunggu di executor LLM hanya selama sisa waktunya,
+        sehingga stream yang macet dihentikan dengan LLMDeadlineExceeded.
+        """
+        if not self.available():
+            raise LLMUnavailable(f"LLM provider {self.name} is not configured.")
+        return self._bounded_stream(self._stream(prompt, task, context or {}, deadline), task, deadline)
+
+    def _bounded_stream(self, chunks, task, deadline):
+        expires = time.monotonic() + deadline
+        executor = None if in_llm_worker() else get_llm_executor()
+        while True:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                chunks.close()
+                raise LLMDeadlineExceeded(f"{self.name} stream for task {task} exceeded {deadline}s.")
+            if executor is None:
+                text = next(chunks, None)
+            else:
+                future = executor.submit(next, chunks, None)
+                try:
+                    text = future.result(timeout=remaining)
+                except FuturesTimeoutError:
+                    # Potongan yang sedang ditunggu tetap berjalan di executor sampai timeout SDK-nya
+                    future.cancel()
+                    raise LLMDeadlineExceeded(f"{self.name} stream for task {task} exceeded {deadline}s.")
+            if text is None:
+                return
+            yield text
+
+def _chunk_text(chunk):
+    # .text melempar ValueError untuk chunk tanpa teks (mis. hanya metadata safety)
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+def _is_deadline_error(error):
+    return isinstance(error, TimeoutError) or type(error).__name__ in ("DeadlineExceeded", "Timeout", "ReadTimeout")
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini. API key dikonfigurasi sekali per proses dan instance
+    GenerativeModel (teks biasa dan output JSON) dibuat sekali lalu dipakai
+    ulang oleh semua request.
+    """
+
+    name = "gemini"
+    model_name = GEMINI_MODEL_NAME
+
+    def __init__(self, api_key=GEMINI_API_KEY, model_name=GEMINI_MODEL_NAME):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._models = {}
+        self._lock = threading.Lock()
+        self._configured = False
+        if not api_key:
+            logger.error("GEMINI_API_KEY tidak ditemukan. Fungsi AI tidak akan bekerja.")
+
+    def available(self):
+        return bool(self.api_key)
+
+    def warmup(self):
+        if not self.available():
+            return False
+        self._model(False)
+        return True
+
+    def _model(self, json_output):
+        model = self._models.get(json_output)
+        if model is None:
+            with self._lock:
+                if not self._configured:
+                    genai.configure(api_key=self.api_key)
+                    self._configured = True
+                    logger.info("Google Gemini API berhasil dikonfigurasi.")
+                model = self._models.get(json_output)
+                if model is None:
+                    generation_config = (
+                        genai.types.GenerationConfig(response_mime_type="application/json") if json_output else None
+                    )
+                    model = genai.GenerativeModel(self.model_name, generation_config=generation_config)
+                    self._models[json_output] = model
+        return model
+
+    def _request_options(self, timeout):
+        # Retry bawaan SDK berjalan hingga 120 detik; dibatasi agar panggilan yang sudah
+        # ditinggalkan pemanggil tidak terus menahan worker executor LLM
+        return {"timeout": timeout, "retry": api_retry.Retry(timeout=timeout)}
+
+    def _generate(self, prompt, task, context, json_output, timeout):
+        try:
+            response = self._model(json_output).generate_content(prompt, request_options=self._request_options(timeout))
+            return response.text
+        except Exception as e:
+            if _is_deadline_error(e):
+                raise LLMDeadlineExceeded(f"Gemini call for task {task} exceeded {timeout}s.") from e
+            raise
+
+    def _stream(self, prompt, task, context, timeout):
+        try:
+            response = self._model(False).generate_content(
+                prompt, stream=True, request_options=self._request_options(timeout)
+            )
+            for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+        except Exception as e:
+            if _is_deadline_error(e):
+                raise LLMDeadlineExceeded(f"Gemini stream for task {task} exceeded {timeout}s.") from e
+            raise
+
+# Templat pertanyaan stub lokal; dipilih berdasarkan hash topik agar hasilnya deterministik
+STUB_QUESTION_TEMPLATES = (
+    "Ceritakan pengalaman Anda yang paling relevan dengan {topic}.",
+    "Apa tantangan terbesar yang pernah Anda hadapi terkait {topic} dan bagaimana Anda mengatasinya?",
+    "Mengapa Anda tertarik mengembangkan karier di bidang {topic}?",
+    "Keterampilan apa yang menurut Anda paling penting untuk {topic}?",
+    "Bagaimana Anda terus belajar dan mengikuti perkembangan {topic}?",
+    "Ceritakan saat Anda bekerja dalam tim untuk menyelesaikan masalah {topic}.",
+    "Bagaimana Anda mengukur keberhasilan pekerjaan Anda dalam {topic}?",
+    "Apa rencana Anda lima tahun ke depan di bidang {topic}?",
+)
+
+class LocalStubProvider(LLMProvider):
+    """
+    Provider deterministik tanpa jaringan untuk load test dan development
+    offline: hasil yang sama untuk input yang sama, dibangun dari context
+    (penilai lokal untuk umpan balik). LLM_STUB_LATENCY_MS menambahkan jeda
+    buatan per panggilan.
+    """
+
+    name = "local"
+    model_name = "local-stub"
+
+    def __init__(self, latency_ms=LLM_STUB_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def _sleep(self, share=1.0):
+        if self.latency_ms:
+            time.sleep(self.latency_ms * share / 1000)
+
+    def _overall_feedback(self, answers):
+        results = [score_answer(answer) for _, answer in answers]
+        if not results:
+            return "Belum ada jawaban yang dapat dinilai pada sesi ini."
+        average = sum(result["score"] for result in results) / len(results)
+        strongest = max(range(len(results)), key=lambda index: results[index]["score"])
+        weakest = min(range(len(results)), key=lambda index: results[index]["score"])
+        return (
+            f"Anda menjawab {len(results)} pertanyaan dengan skor rata-rata {average:.0f} dari 100. "
+            f"Jawaban terkuat Anda ada pada pertanyaan \"{answers[strongest][0]}\". "
+            f"Perhatikan kembali jawaban untuk pertanyaan \"{answers[weakest][0]}\": {results[weakest]['feedback']} "
+            "Latih jawaban dengan struktur situasi, tindakan, dan hasil agar lebih jelas dan terstruktur."
+        )
+
+    def _respond(self, task, context):
+        if task == "interview_questions":
+            topic = context.get("topic", "")
+            count = int(context.get("count", 5))
+            offset = int(hashlib.sha256(topic.encode("utf-8")).hexdigest(), 16) % len(STUB_QUESTION_TEMPLATES)
+            questions = [
+                STUB_QUESTION_TEMPLATES[(offset + index) % len(STUB_QUESTION_TEMPLATES)].format(topic=topic)
+                for index in range(count)
+            ]
+            return json.dumps(questions, ensure_ascii=False)
+        if task == "answer_feedback":
+            return local_answer_feedback(context.get("question"), context.get("answer"), context.get("keywords") or ())
+        if task == "overall_feedback":
+            return self._overall_feedback(context.get("answers", []))
+        if task == "batch_feedback":
+            answers = context.get("answers", {})
+            return json.dumps({
+                "answers": [
+                    {"index": index, "feedback": local_answer_feedback(question, answer)}
+                    for index, (question, answer) in answers.items()
+                ],
+                "overall_feedback": self._overall_feedback(list(answers.values()))
+            }, ensure_ascii=False)
+        raise LLMError(f"Local stub provider does not support task {task}.")
+
+    def _generate(self, prompt, task, context, json_output, timeout):
+        self._sleep()
+        return self._respond(task, context)
+
+    def _stream(self, prompt, task, context, timeout):
+        # Jeda buatan dibagi rata per kalimat agar menyerupai streaming token
+        sentences = [sentence for sentence in re.split(r"(?<=[.!?])\s+", self._respond(task, context)) if sentence]
+        for index, sentence in enumerate(sentences):
+            self._sleep(1 / len(sentences))
+            yield sentence + (" " if index < len(sentences) - 1 else "")
+
+PROVIDERS = {"gemini": GeminiProvider, "local": LocalStubProvider}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_llm_provider():
+    """Provider global sesuai LLM_PROVIDER, dibuat sekali per proses."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                provider_class = PROVIDERS.get(LLM_PROVIDER)
+                if provider_class is None:
+                    logger.error(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}', falling back to gemini.")
+                    provider_class = GeminiProvider
+                _provider = provider_class()
+                logger.info(f"LLM provider: {_provider.name} ({_provider.model_name})")
+    return _provider
+
+def warmup_llm_provider():
+    """Hook warmup: konfigurasi SDK dan membuat instance model sebelum request pertama."""
+    return get_llm_provider().warmup()
+
+register_warmup("llm_provider", warmup_llm_provider)
@@ -0,0 +1,128 @@
+# local_scorer.py
+import logging
+import re
+
+from lazy_loader import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# nltk (beserta scipy) di-import saat jawaban pertama dinilai, bukan saat startup
+nltk_tokenize = lazy_import("nltk.tokenize")
+
+def tokenize(text):
+    """Token kata huruf kecil memakai nltk; regex sederhana jika data tokenizer nltk belum terpasang."""
+    try:
+        return nltk_tokenize.word_tokenize(text.lower())
+    except LookupError:
+        return re.findall(r"\w+", text.lower())
+
+def score_answer(transcribed_text, response_time=None, keywords=(), ideal_length=15):
+    """
+    Penilaian lokal berbasis panjang jawaban dan kata kunci (logika asli
+    /api/hrd/analyze_response), tanpa LLM. Mengembalikan dict score (0-100),
+    feedback, expression (happy/neutral/confused/bored), word_count, dan
+    matched_keywords (None jika tidak ada kata kunci).
+    response_time None berarti waktu menjawab tidak diketahui.
+    """
+    transcribed_text = (transcribed_text or "").strip()
+    keywords = list(keywords or [])
+    score = 0
+    feedback_message = ""
+    expression = "neutral"
+
+    if not transcribed_text or len(transcribed_text.split()) < 3:
+        if response_time is not None and response_time >= 29:
+            feedback_message = "Waktu habis dan Anda tidak memberikan jawaban yang cukup."
+            expression = "bored"
+            score = 5
+        else:
+            feedback_message = "Jawaban Anda terlalu singkat. Mohon berikan jawaban yang lebih lengkap dan jelas."
+            expression = "confused"
+            score = 10
+        return {
+            "score": score,
+            "feedback": feedback_message,
+            "expression": expression,
+            "word_count": len(transcribed_text.split()),
+            "matched_keywords": None,
+            "short_answer": True
+        }
+
+    words = tokenize(transcribed_text)
+    num_words = len(words)
+
+    base_score_length = 0
+    if num_words < ideal_length * 0.4:
+        feedback_message += "Jawaban Anda masih terlalu singkat. Coba elaborasi lebih lanjut. "
+        base_score_length = 20
+        expression = "confused"
+    elif num_words < ideal_length * 0.7:
+        feedback_message += "Jawaban Anda cukup baik, namun bisa lebih detail. "
+        base_score_length = 40
+        expression = "neutral"
+    elif num_words < ideal_length * 1.5:
+        feedback_message += "Panjang jawaban Anda sudah baik dan cukup komprehensif. "
+        base_score_length = 60
+        expression = "neutral"
+    else:
+        feedback_message += "Jawaban Anda sangat detail. Pastikan tetap fokus pada inti pertanyaan. "
+        base_score_length = 50
+        expression = "happy"
+
+    score += base_score_length
+
+    matched_keywords_count = 0
+    if keywords:
+        unique_answer_words = set(words)
+        for kw in keywords:
+            if kw.lower() in unique_answer_words:
+                matched_keywords_count += 1
+
+        keyword_score_bonus = 0
+        if matched_keywords_count == 0 and num_words > 5:
+            feedback_message += "Namun, jawaban Anda sepertinya kurang menyentuh poin-poin kunci yang diharapkan. "
+            score = max(15, score - 15)
+            if expression == "happy": expression = "confused"
+        elif matched_keywords_count > 0 and matched_keywords_count <= len(keywords) / 2:
+            feedback_message += "Beberapa poin penting sudah Anda sebutkan. "
+            keyword_score_bonus = 15
+            if expression == "confused": expression = "neutral"
+        elif matched_keywords_count > len(keywords) / 2:
+            feedback_message += "Anda berhasil menyoroti banyak poin kunci dengan baik! "
+            keyword_score_bonus = 30
+            expression = "happy"
+
+        score += keyword_score_bonus
+    else:
+        feedback_message += "Pertanyaan ini tidak memiliki kata kunci spesifik untuk dinilai. Penilaian berdasarkan kejelasan dan kelengkapan. "
+        if score < 50 and num_words > ideal_length * 0.7 :
+            score = max(score, 50)
+            expression = "neutral" if expression == "confused" else expression
+
+    if response_time is not None and response_time < 3 and num_words < ideal_length * 0.5:
+        feedback_message += "Anda menjawab sangat cepat, mungkin kurang dipertimbangkan. "
+        score = max(10, score - 20)
+        expression = "confused"
+
+    score = min(max(0, score), 100)
+
+    if expression == "neutral" or expression == "confused":
+        if score >= 75:
+            expression = "happy"
+        elif score >= 50:
+            expression = "neutral"
+        else:
+            expression = "confused"
+
+    return {
+        "score": score,
+        "feedback": feedback_message.strip() if feedback_message else "Jawaban Anda telah diterima.",
+        "expression": expression,
+        "word_count": num_words,
+        "matched_keywords": matched_keywords_count if keywords else None,
+        "short_answer": False
+    }
+
+def local_answer_feedback(question_text, response_text, keywords=()):
+    """Umpan balik singkat per jawaban tanpa LLM, dipakai saat batas waktu LLM terlewati dan oleh stub lokal."""
+    return score_answer(response_text, keywords=keywords)["feedback"]
@@ -0,0 +1,176 @@
+# question_bank.py
+import datetime
+import logging
+import random
+import threading
+
+from pymongo.errors import DuplicateKeyError
+
+from config import (
+    INTERVIEW_TOPICS, QUESTION_BANK_BATCH_SIZE, QUESTION_BANK_CHECK_INTERVAL_SECONDS,
+    QUESTION_BANK_POOL_SIZE, QUESTION_BANK_REFRESH_SECONDS
+)
+from database import get_collections
+
+logger = logging.getLogger(__name__)
+
+def _normalize(text):
+    return " ".join(str(text).split()).casefold()
+
+def match_catalog_topic(topic):
+    """ID topik INTERVIEW_TOPICS jika topik sama dengan ID atau nama katalog (tanpa beda spasi/huruf), atau None."""
+    if not topic or not isinstance(topic, str):
+        return None
+    normalized = _normalize(topic)
+    for topic_id, details in INTERVIEW_TOPICS.items():
+        if normalized in (_normalize(topic_id), _normalize(details["name"])):
+            return topic_id
+    return None
+
+class QuestionBank:
+    """
+    Pool pertanyaan per topik katalog di koleksi Mongo `question_bank`.
+    Thread background mengisi pool hingga QUESTION_BANK_POOL_SIZE dan
+    menambahkan batch baru setiap QUESTION_BANK_REFRESH_SECONDS (pertanyaan
+    tertua dibuang), sehingga start_session cukup mengambil sampel dari Mongo.
+
+    `generate(topic_id, topic, count)` adalah callable yang mengembalikan list
+    string pertanyaan (mis. lewat Gemini); exception dari generate hanya
+    dicatat dan topik dicoba lagi pada putaran berikutnya.
+    """
+
+    def __init__(self, topics=INTERVIEW_TOPICS, pool_size=QUESTION_BANK_POOL_SIZE,
+                 batch_size=QUESTION_BANK_BATCH_SIZE, refresh_seconds=QUESTION_BANK_REFRESH_SECONDS):
+        self.topics = topics
+        self.pool_size = max(1, int(pool_size))
+        self.batch_size = max(1, int(batch_size))
+        self.refresh_seconds = refresh_seconds
+        self._index_ready = False
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _collection(self):
+        collection = get_collections()["question_bank"]
+        if not self._index_ready:
+            collection.create_index([("topic_id", 1), ("question_key", 1)], unique=True)
+            collection.create_index([("topic_id", 1), ("created_at", -1)])
+            self._index_ready = True
+        return collection
+
+    def count(self, topic_id):
+        return self._collection().count_documents({"topic_id": topic_id})
+
+    def sample(self, topic_id, count):
+        """`count` pertanyaan acak dari pool topik, atau None jika pool belum cukup (pool juga diminta diisi)."""
+        questions = [document["question"] for document in self._collection().find({"topic_id": topic_id}, {"question": 1})]
+        with self._lock:
+            if len(questions) < count:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if len(questions) < count:
+            self.request_refresh()
+            return None
+        return random.sample(questions, count)
+
+    def add_questions(self, topic_id, questions, source=None):
+        """Menyimpan pertanyaan baru; duplikat (setelah normalisasi) dilewati. Mengembalikan jumlah yang tersimpan."""
+        collection = self._collection()
+        now = datetime.datetime.utcnow()
+        inserted = 0
+        for question in questions:
+            if not isinstance(question, str) or not question.strip():
+                continue
+            try:
+                collection.insert_one({
+                    "topic_id": topic_id,
+                    "question": question.strip(),
+                    "question_key": _normalize(question),
+                    "source": source,
+                    "created_at": now
+                })
+                inserted += 1
+            except DuplicateKeyError:
+                continue
+        return inserted
+
+    def trim(self, topic_id):
+        """Membuang pertanyaan tertua di atas pool_size."""
+        collection = self._collection()
+        stale = [
+            document["_id"] for document in
+            collection.find({"topic_id": topic_id}, {"_id": 1}).sort("created_at", -1).skip(self.pool_size)
+        ]
+        if stale:
+            collection.delete_many({"_id": {"$in": stale}})
+        return len(stale)
+
+    def needs_refresh(self, topic_id, now=None):
+        now = now or datetime.datetime.utcnow()
+        collection = self._collection()
+        if collection.count_documents({"topic_id": topic_id}) < self.pool_size:
+            return True
+        newest = collection.find_one({"topic_id": topic_id}, {"created_at": 1}, sort=[("created_at", -1)])
+        return newest is None or (now - newest["created_at"]).total_seconds() > self.refresh_seconds
+
+    def refresh_topic(self, topic_id, generate):
+        questions = generate(topic_id, self.topics[topic_id], self.batch_size)
+        inserted = self.add_questions(topic_id, questions, source="generated")
+        removed = self.trim(topic_id)
+        logger.info(f"Question bank '{topic_id}': {inserted} new questions, {removed} old questions removed.")
+        return inserted
+
+    def refresh_all(self, generate):
+        """Satu putaran: mengisi setiap topik yang kurang atau basi, satu batch per topik."""
+        refreshed = {}
+        for topic_id in self.topics:
+            try:
+                if self.needs_refresh(topic_id):
+                    refreshed[topic_id] = self.refresh_topic(topic_id, generate)
+            except Exception as e:
+                logger.error(f"Failed to refresh question bank for topic '{topic_id}': {e}")
+        return refreshed
+
+    def request_refresh(self):
+        """Membangunkan thread refresher sebelum interval berikutnya (mis. saat pool kurang)."""
+        self._wake.set()
+
+    def start_refresher(self, generate, interval_seconds=QUESTION_BANK_CHECK_INTERVAL_SECONDS):
+        """Menjalankan refresh_all di thread daemon setiap interval_seconds; aman dipanggil berulang."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+
+            def run():
+                while True:
+                    refreshed = self.refresh_all(generate)
+                    # Pool yang masih kurang diisi lagi segera, tanpa menunggu interval penuh
+                    if any(refreshed.values()):
+                        continue
+                    self._wake.wait(interval_seconds)
+                    self._wake.clear()
+
+            self._thread = threading.Thread(target=run, name="question-bank-refresher", daemon=True)
+            self._thread.start()
+            logger.info("Question bank refresher started.")
+            return self._thread
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "refresher_running": self._thread is not None and self._thread.is_alive()
+            }
+        stats["pool"] = {topic_id: self.count(topic_id) for topic_id in self.topics}
+        return stats
+
+_question_bank = QuestionBank()
+
+def get_question_bank():
+    return _question_bank
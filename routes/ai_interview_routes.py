@@ -1,79 +1,161 @@
-import os
-import cv2
 import json
-import base64
 import logging
 import datetime
-import tempfile
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from bson import ObjectId, errors
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from simple_websocket import ConnectionClosed
 
 # Import dependensi proyek Anda
 from database import get_collections
-from auth_decorators import token_required, require_api_key
-from config import GEMINI_API_KEY
-from detectors.facial_expression_detector import detect_facial_expression
-from detectors.mouth_detector import detect_mouth_status
-from detectors.pose_detector import detect_pose_status
-
-# Import dan Konfigurasi Gemini SDK
-import google.generativeai as genai
+from auth_decorators import token_required, require_api_key, get_user_from_token, is_valid_api_key
+from config import (
+    ANALYSIS_WINDOW_FRESH_SECONDS, INTERVIEW_TOPICS, LLM_FEEDBACK_DEADLINE_SECONDS, MAX_FRAMES_PER_BATCH,
+    QUESTION_BANK_ENABLED, QUESTIONS_PER_SESSION,
+    STREAM_AUTH_TIMEOUT_SECONDS, STREAM_IDLE_TIMEOUT_SECONDS, STREAM_SESSION_CHECK_SECONDS
+)
+from detectors.face_analyzer import summarize_analyses
+from detectors.frame_decoder import decode_base64_frame, decode_frame_bytes
+from detectors.runtime import get_detector_runtime
+from detectors.temporal_aggregator import align_client_timestamps, get_temporal_aggregator
+from extensions import sock
+from frame_stream import LatestFrameSlot
+from frame_upload import FrameUploadError, detector_backpressure, max_request_bytes, read_frame_upload, read_json_body
+from job_queue import enqueue, get_job, register_job_handler
+from llm_cache import get_llm_cache
+from llm_providers import LLMDeadlineExceeded, LLMError, get_llm_provider
+from local_scorer import local_answer_feedback
+from question_bank import get_question_bank, match_catalog_topic
+from llm_executor import submit_timed
 
 # Inisialisasi Blueprint dan Logger
 ai_interview_bp = Blueprint('ai_interview_bp', __name__, url_prefix='/api/ai_interview')
 logger = logging.getLogger(__name__)
 
-# Konfigurasi Gemini API Key
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    logger.info("Google Gemini API berhasil dikonfigurasi.")
-else:
-    logger.error("GEMINI_API_KEY tidak ditemukan. Fungsi AI tidak akan bekerja.")
-
 # Helper untuk mendapatkan koleksi database
 def get_ai_interview_collections():
     cols = get_collections()
     return cols["interviews"]
 
-# Helper untuk mendapatkan model Gemini
-def get_gemini_model():
-    if not GEMINI_API_KEY:
-        return None
+# Pertanyaan wawancara untuk satu topik, sebagai list string. prompt_context
+# (dari INTERVIEW_TOPICS) menggantikan persona default untuk topik katalog.
+def generate_interview_questions(provider, topic, count=QUESTIONS_PER_SESSION, prompt_context=None):
+    persona = prompt_context or "Anda adalah seorang ahli perekrutan HRD."
+    prompt = f"""
+    {persona} Berdasarkan topik wawancara dari kandidat, buatlah {count} pertanyaan wawancara yang relevan dan mendalam.
+    Topik dari kandidat: "{topic}"
+    
+    Tugas Anda: Hasilkan sebuah array JSON yang valid berisi {count} string pertanyaan dalam Bahasa Indonesia.
+    Pastikan output Anda HANYA berupa array JSON, tanpa teks atau format tambahan.
+    """
+    response_text = provider.generate(
+        prompt, "interview_questions", context={"topic": topic, "count": count}, json_output=True
+    )
     try:
-        # Menggunakan model flash yang lebih cepat, cocok untuk interaksi real-time
-        return genai.GenerativeModel('gemini-1.5-flash-latest')
-    except Exception as e:
-        logger.error(f"Gagal menginisialisasi model Gemini: {e}")
+        questions_list = json.loads(response_text)
+    except json.JSONDecodeError:
+        logger.error(f"Gagal mem-parsing JSON dari AI untuk topik '{topic}'. Respons: {response_text}")
+        raise
+    if not isinstance(questions_list, list) or len(questions_list) == 0:
+        raise ValueError("AI tidak mengembalikan daftar pertanyaan yang valid.")
+    return questions_list
+
+# Umpan balik singkat per jawaban; dipanggil dari executor LLM dengan batas
+# LLM_FEEDBACK_DEADLINE_SECONDS. keywords hanya dipakai oleh stub lokal.
+def generate_realtime_feedback(provider, question_text, response_text, keywords=()):
+    feedback_prompt = f"""
+    Anda adalah seorang HRD profesional. Berikan umpan balik singkat (1-2 kalimat) yang konstruktif untuk jawaban kandidat.
+    Pertanyaan: "{question_text}"
+    Jawaban Kandidat: "{response_text}"
+    Fokus pada kejelasan, relevansi, dan struktur jawaban. Output HANYA teks umpan balik.
+    """
+    return provider.generate(
+        feedback_prompt, "answer_feedback",
+        context={"question": question_text, "answer": response_text, "keywords": list(keywords)},
+        deadline=LLM_FEEDBACK_DEADLINE_SECONDS
+    ).strip()
+
+# Pembungkus cache: topik populer dan retry klien dengan pasangan pertanyaan/jawaban
+# yang sama tidak memanggil Gemini lagi. Mengembalikan (hasil, sumber cache atau None).
+def get_interview_questions(provider, topic, prompt_context=None):
+    return get_llm_cache().get_or_compute(
+        "interview_questions", provider.model_name, {"topic": topic, "context": prompt_context},
+        lambda: generate_interview_questions(provider, topic, prompt_context=prompt_context)
+    )
+
+# Generator untuk refresher question bank (thread background)
+def generate_catalog_questions(topic_id, topic, count):
+    return generate_interview_questions(
+        get_llm_provider(), topic["name"], count=count, prompt_context=topic["prompt_context"]
+    )
+
+def start_question_bank_refresher():
+    return get_question_bank().start_refresher(generate_catalog_questions)
+
+def get_realtime_feedback(provider, question_text, response_text, keywords=()):
+    return get_llm_cache().get_or_compute(
+        "realtime_feedback", provider.model_name, {"question": question_text, "answer": response_text},
+        lambda: generate_realtime_feedback(provider, question_text, response_text, keywords)
+    )
+
+def topic_keywords(session_doc):
+    """Kata kunci topik katalog sesi untuk penilai lokal (kosong untuk topik bebas)."""
+    topic = INTERVIEW_TOPICS.get(session_doc.get("topic_id") or "")
+    return topic.get("keywords", []) if topic else []
+
+# Kunci tracker FaceMesh per sesi. Digabung dengan user_id agar frame dari
+# pengguna lain tidak bisa mengganggu state tracking sesi milik orang lain.
+def get_session_tracker_key(current_user, session_id):
+    if not session_id:
         return None
+    return f"{current_user['_id']}:{session_id}"
 
 # ==============================================================================
 # FUNGSI KALKULASI SKOR KEPERCAYAAN DIRI
 # ==============================================================================
-def calculate_confidence_score(pose_status, expression_status, real_time_gemini_feedback):
+# Poin visual per label. Nilai diberi bobot sesuai proporsi frame dalam jendela temporal.
+POSE_POINTS = {"lurus": 30, "miring": 10, "miring_kiri": 10, "miring_kanan": 10}
+EXPRESSION_POINTS = {"senang": 30, "netral": 20, "gugup": 5, "sedih": -10, "marah": -10, "terkejut": -10}
+
+def calculate_confidence_score(pose_distribution, expression_distribution, real_time_gemini_feedback):
+    """
+    Menghitung skor kepercayaan diri dari distribusi label visual dalam jendela
+    temporal (mis. {"lurus": 0.8, "miring": 0.2}) dan umpan balik Gemini.
+    Satu label tunggal juga diterima dan diperlakukan sebagai {label: 1.0}.
+    """
+    if isinstance(pose_distribution, str):
+        pose_distribution = {pose_distribution: 1.0}
+    if isinstance(expression_distribution, str):
+        expression_distribution = {expression_distribution: 1.0}
+    pose_distribution = pose_distribution or {}
+    expression_distribution = expression_distribution or {}
+
     score = 0
     feedback_points = []
 
-    # 1. Poin dari Isyarat Visual
+    # 1. Poin dari Isyarat Visual (rata-rata berbobot atas seluruh jendela)
+    score += sum(POSE_POINTS.get(label, 0) * share for label, share in pose_distribution.items())
+    score += sum(EXPRESSION_POINTS.get(label, 0) * share for label, share in expression_distribution.items())
+
+    pose_status = max(pose_distribution, key=pose_distribution.get) if pose_distribution else None
+    expression_status = max(expression_distribution, key=expression_distribution.get) if expression_distribution else None
+
     if pose_status == "lurus":
-        score += 30
         feedback_points.append("Postur tubuh Anda terlihat tegak dan profesional.")
-    elif pose_status in ["miring_kiri", "miring_kanan"]:
-        score += 10
+    elif pose_status in ["miring", "miring_kiri", "miring_kanan"]:
         feedback_points.append("Perhatikan postur tubuh Anda, hindari posisi miring.")
     else:
         feedback_points.append("Postur tubuh tidak terdeteksi.")
 
     if expression_status == "senang":
-        score += 30
         feedback_points.append("Ekspresi Anda menunjukkan antusiasme dan positif.")
     elif expression_status == "netral":
-        score += 20
         feedback_points.append("Ekspresi Anda menunjukkan ketenangan.")
     elif expression_status == "gugup":
-        score += 5
         feedback_points.append("Ekspresi Anda terlihat sedikit tegang atau gugup.")
     elif expression_status in ["sedih", "marah", "terkejut"]:
-        score -= 10
         feedback_points.append(f"Ekspresi Anda ({expression_status}) mungkin kurang sesuai untuk konteks wawancara.")
     else:
         feedback_points.append("Ekspresi wajah tidak terdeteksi.")
@@ -100,7 +182,7 @@ def calculate_confidence_score(pose_status, expression_status, real_time_gemini_
         feedback_points.append("Jawaban Anda kurang relevan dengan pertanyaan.")
 
     # Normalisasi skor antara 0 dan 100
-    score = max(0, min(100, score))
+    score = max(0, min(100, int(round(score))))
 
     # Ringkasan umpan balik kepercayaan diri
     if score >= 80:
@@ -114,6 +196,13 @@ def calculate_confidence_score(pose_status, expression_status, real_time_gemini_
 
     return {"score": score, "feedback_points": feedback_points, "summary": summary}
 
+def visual_distributions(visual_window, visual_analysis):
+    """Distribusi pose dan ekspresi dari jendela temporal, atau dari label tunggal jika jendela kosong."""
+    if visual_window and visual_window.get("frames"):
+        return visual_window["pose"]["distribution"], visual_window["expression"]["distribution"]
+    visual_analysis = visual_analysis or {}
+    return {visual_analysis.get("pose"): 1.0}, {visual_analysis.get("expression"): 1.0}
+
 # ==============================================================================
 # ENDPOINT API
 # ==============================================================================
@@ -124,35 +213,34 @@ def calculate_confidence_score(pose_status, expression_status, real_time_gemini_
 def start_ai_interview_session(current_user):
     """
     Memulai sesi wawancara AI baru berdasarkan topik yang diberikan pengguna.
-    AI akan menghasilkan 5 pertanyaan di awal sesi.
+    Topik katalog diambil dari question bank; AI hanya dipanggil untuk topik bebas.
     """
     logger.info(f"Permintaan memulai sesi wawancara AI oleh pengguna: {current_user.get('username')}")
     data = request.get_json()
     custom_topic = data.get('custom_topic')
+    topic_id = match_catalog_topic(data.get('topic_id')) or match_catalog_topic(custom_topic)
+    if topic_id and not custom_topic:
+        custom_topic = INTERVIEW_TOPICS[topic_id]["name"]
+    feedback_mode = "deferred" if data.get('deferred_feedback') is True else "realtime"
 
     if not custom_topic or not isinstance(custom_topic, str) or len(custom_topic.strip()) < 5:
         return jsonify({"status": "fail", "message": "Topik wawancara tidak valid. Harap masukkan topik yang spesifik (minimal 5 karakter)."}), 400
 
-    model = get_gemini_model()
-    if not model:
-        return jsonify({"status": "error", "message": "Layanan AI tidak terkonfigurasi dengan benar."}), 500
-
     try:
-        # Prompt baru untuk menghasilkan 5 pertanyaan dalam format JSON
-        generation_config = genai.types.GenerationConfig(response_mime_type="application/json")
-        prompt = f"""
-        Anda adalah seorang ahli perekrutan HRD. Berdasarkan topik wawancara dari kandidat, buatlah 5 pertanyaan wawancara yang relevan dan mendalam.
-        Topik dari kandidat: "{custom_topic}"
-        
-        Tugas Anda: Hasilkan sebuah array JSON yang valid berisi 5 string pertanyaan dalam Bahasa Indonesia.
-        Pastikan output Anda HANYA berupa array JSON, tanpa teks atau format tambahan.
-        """
-        
-        response = model.generate_content(prompt, generation_config=generation_config)
-        questions_list = json.loads(response.text)
+        questions_list = None
+        question_source = "bank"
+        if topic_id and QUESTION_BANK_ENABLED:
+            questions_list = get_question_bank().sample(topic_id, QUESTIONS_PER_SESSION)
 
-        if not isinstance(questions_list, list) or len(questions_list) == 0:
-            raise ValueError("AI tidak mengembalikan daftar pertanyaan yang valid.")
+        if questions_list is None:
+            provider = get_llm_provider()
+            if not provider.available():
+                return jsonify({"status": "error", "message": "Layanan AI tidak terkonfigurasi dengan benar."}), 500
+            # Pertanyaan dalam format JSON; topik yang sama diambil dari cache LLM
+            prompt_context = INTERVIEW_TOPICS[topic_id]["prompt_context"] if topic_id else None
+            questions_list, cache_source = get_interview_questions(provider, custom_topic.strip(), prompt_context)
+            question_source = f"cache_{cache_source}" if cache_source else "live"
+        logger.info(f"Pertanyaan untuk topik '{custom_topic}' diambil dari {question_source}.")
 
         # Siapkan data pertanyaan untuk disimpan di database
         questions_to_store = [{"question": q} for q in questions_list]
@@ -162,6 +250,9 @@ def start_ai_interview_session(current_user):
             "username": current_user['username'],
             "timestamp": datetime.datetime.utcnow(),
             "category_name": custom_topic.strip(),
+            "topic_id": topic_id,
+            "question_source": question_source,
+            "feedback_mode": feedback_mode,
             "status": "in_progress",
             "questions_asked": questions_to_store,
             "overall_feedback": None,
@@ -175,63 +266,365 @@ def start_ai_interview_session(current_user):
             "status": "success",
             "message": "Sesi wawancara dimulai.",
             "session_id": session_id,
+            "topic_id": topic_id,
+            "feedback_mode": feedback_mode,
             "questions": questions_list  # Kirim semua pertanyaan ke frontend
         }), 201
 
     except json.JSONDecodeError:
-        logger.error(f"Gagal mem-parsing JSON dari AI untuk topik '{custom_topic}'. Respons: {response.text}")
         return jsonify({"status": "error", "message": "Gagal menghasilkan pertanyaan. Format dari AI tidak valid. Coba topik lain."}), 500
+    except LLMDeadlineExceeded as e:
+        logger.error(f"Pembuatan pertanyaan melewati batas waktu: {e}")
+        return jsonify({"status": "error", "message": "Layanan AI tidak merespons tepat waktu, silakan coba lagi."}), 504
     except Exception as e:
         logger.error(f"Error saat memulai sesi wawancara AI: {e}", exc_info=True)
         return jsonify({"status": "error", "message": f"Terjadi kesalahan internal: {str(e)}"}), 500
 
 
+@ai_interview_bp.route("/topics", methods=["GET"])
+@token_required
+@require_api_key
+def get_interview_topics(current_user):
+    """
+    Daftar topik katalog INTERVIEW_TOPICS. Sesi dengan topic_id dari daftar ini
+    dimulai langsung dari question bank.
+    """
+    return jsonify({
+        "status": "success",
+        "topics": [{"id": topic_id, "name": details["name"]} for topic_id, details in INTERVIEW_TOPICS.items()]
+    }), 200
+
+@ai_interview_bp.route("/question_bank_stats", methods=["GET"])
+@token_required
+@require_api_key
+def get_question_bank_stats(current_user):
+    """
+    Ukuran pool per topik katalog dan hit/miss pengambilan dari question bank.
+    """
+    return jsonify({"status": "success", "question_bank": get_question_bank().stats()}), 200
 
 @ai_interview_bp.route("/analyze_frame", methods=["POST"])
 @token_required
 @require_api_key
+@detector_backpressure
 def analyze_realtime_frame(current_user):
     """
     Endpoint ringan yang HANYA menerima satu frame gambar,
     melakukan deteksi visual, dan mengembalikan hasilnya.
     Didesain untuk dipanggil secara berulang oleh frontend.
+
+    Frame boleh dikirim sebagai JSON {"frame": base64}, multipart/form-data
+    (file `frame`), atau body image/jpeg mentah dengan ?session_id=... .
     """
-    data = request.get_json()
-    frame_base64 = data.get('frame')
+    try:
+        upload = read_frame_upload()
+    except FrameUploadError as e:
+        return jsonify({"status": "fail", "message": e.message}), e.status_code
+    session_key = get_session_tracker_key(current_user, upload.fields.get('session_id'))
 
-    if not frame_base64:
+    if not upload.provided:
         return jsonify({"status": "fail", "message": "Frame gambar tidak ditemukan."}), 400
 
-    image_path = None
     try:
-        # Simpan frame ke file temporer untuk diproses
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-            image_path = tmp.name
-            tmp.write(base64.b64decode(frame_base64))
-        
-        # Jalankan semua detektor visual
+        # Frame sudah di-decode langsung di memori, tanpa file temporer
+        frame = upload.frame
+        if frame is None:
+            return jsonify({"status": "fail", "message": "Data gambar tidak valid."}), 400
+
+        # Jalankan semua detektor visual dengan satu kali inferensi FaceMesh.
+        # Jika session_id dikirim, tracker mode video milik sesi tersebut dipakai ulang.
+        runtime = get_detector_runtime()
+        face_analysis = runtime.analyze(frame, session_key=session_key)
         analysis_results = {
-            "pose": detect_pose_status(image_path),
-            "mouth": detect_mouth_status(image_path),
-            "expression": detect_facial_expression(image_path)
+            "pose": face_analysis["pose"],
+            "mouth": face_analysis["mouth"],
+            "expression": face_analysis["expression"]
         }
         
         # Tidak perlu logging di sini untuk menghindari spam log
         # logger.debug(f"Analisis frame real-time untuk {current_user['username']}: {analysis_results}")
 
-        return jsonify({
+        response = {
             "status": "success",
-            "analysis": analysis_results
-        }), 200
+            "analysis": analysis_results,
+            # Rekomendasi kapan klien sebaiknya mengirim frame berikutnya, sesuai beban server
+            "next_frame_interval_ms": runtime.load_status()["next_frame_interval_ms"]
+        }
+        # Simpan ke jendela temporal sesi agar skor kepercayaan diri memakai banyak frame
+        if session_key:
+            aggregator = get_temporal_aggregator()
+            aggregator.push(session_key, face_analysis)
+            response["window"] = aggregator.snapshot(session_key)
+
+        return jsonify(response), 200
 
     except Exception as e:
         # Hanya log error jika benar-benar terjadi masalah
         logger.error(f"Error pada analisis frame real-time: {e}", exc_info=False)
         return jsonify({"status": "error", "message": "Gagal menganalisis frame."}), 500
+
+@ai_interview_bp.route("/analyze_frames", methods=["POST"])
+@token_required
+@require_api_key
+@detector_backpressure
+def analyze_realtime_frames_batch(current_user):
+    """
+    Varian batch dari /analyze_frame. Menerima N frame (string base64 atau
+    objek {"frame", "timestamp"} dengan timestamp klien dalam milidetik) dalam satu
+    request, menganalisis semuanya sebagai satu batch, dan mengembalikan hasil
+    per-frame beserta agregatnya.
+    """
+    try:
+        data = read_json_body(max_request_bytes(MAX_FRAMES_PER_BATCH))
+    except FrameUploadError:
+        return jsonify({"status": "fail", "message": "Ukuran request terlalu besar."}), 413
+    frames = data.get('frames') if data else None
+    session_key = get_session_tracker_key(current_user, data.get('session_id')) if data else None
+
+    if not frames or not isinstance(frames, list):
+        return jsonify({"status": "fail", "message": "Daftar frame tidak ditemukan."}), 400
+    if len(frames) > MAX_FRAMES_PER_BATCH:
+        return jsonify({"status": "fail", "message": f"Maksimal {MAX_FRAMES_PER_BATCH} frame per request."}), 400
+
+    try:
+        results = []
+        decoded_frames = []
+        for index, item in enumerate(frames):
+            if isinstance(item, dict):
+                frame_base64, timestamp = item.get('frame'), item.get('timestamp')
+            else:
+                frame_base64, timestamp = item, None
+
+            frame = decode_base64_frame(frame_base64) if frame_base64 else None
+            result = {"index": index, "timestamp": timestamp}
+            if frame is None:
+                result["error"] = "Data gambar tidak valid."
+            else:
+                decoded_frames.append((result, frame))
+            results.append(result)
+
+        # Sebar semua frame yang valid ke worker runtime detektor sekaligus
+        runtime = get_detector_runtime()
+        face_analyses = runtime.analyze_many(
+            [frame for _, frame in decoded_frames], session_key=session_key
+        )
+        for (result, _), face_analysis in zip(decoded_frames, face_analyses):
+            result["analysis"] = {
+                "pose": face_analysis["pose"],
+                "mouth": face_analysis["mouth"],
+                "expression": face_analysis["expression"]
+            }
+
+        response = {
+            "status": "success",
+            "results": results,
+            "aggregate": summarize_analyses(face_analyses),
+            "next_frame_interval_ms": runtime.load_status()["next_frame_interval_ms"]
+        }
+        if session_key and face_analyses:
+            # Jarak antar frame dari timestamp klien dipertahankan agar batch tidak menumpuk di satu waktu
+            aggregator = get_temporal_aggregator()
+            aggregator.push(
+                session_key, face_analyses,
+                align_client_timestamps([result["timestamp"] for result, _ in decoded_frames])
+            )
+            response["window"] = aggregator.snapshot(session_key)
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        logger.error(f"Error pada analisis batch frame: {e}", exc_info=False)
+        return jsonify({"status": "error", "message": "Gagal menganalisis batch frame."}), 500
+
+def _authenticate_stream(ws):
+    """
+    Autentikasi sekali per stream. Token dan API key diambil dari header
+    (Authorization, X-API-Key) atau, untuk klien yang tidak bisa mengatur header
+    WebSocket, dari pesan pertama {"type": "auth", "token", "api_key", "session_id"}.
+    Mengembalikan (current_user, session_id, pesan_error).
+    """
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header.split(" ")[1] if " " in auth_header else None
+    api_key = request.headers.get('X-API-Key')
+    session_id = request.args.get('session_id')
+
+    if not token or not api_key:
+        message = ws.receive(timeout=STREAM_AUTH_TIMEOUT_SECONDS)
+        try:
+            auth = json.loads(message) if isinstance(message, str) else {}
+        except ValueError:
+            auth = {}
+        if auth.get('type') != 'auth':
+            return None, None, "Pesan autentikasi tidak ditemukan."
+        token = token or auth.get('token')
+        api_key = api_key or auth.get('api_key')
+        session_id = session_id or auth.get('session_id')
+
+    if not is_valid_api_key(api_key):
+        return None, None, "Invalid API Key"
+    current_user, error = get_user_from_token(token)
+    if error:
+        return None, None, error
+    if not session_id:
+        return None, None, "session_id diperlukan."
+    try:
+        session_doc = get_ai_interview_collections().find_one(
+            {"_id": ObjectId(session_id), "user_id": current_user['_id']}, {"status": 1}
+        )
+    except errors.InvalidId:
+        session_doc = None
+    if not session_doc:
+        return None, None, "Sesi wawancara tidak ditemukan."
+    if session_doc["status"] != "in_progress":
+        return None, None, "Sesi wawancara ini sudah berakhir."
+    return current_user, session_id, None
+
+class _StreamSender:
+    """ws.send yang diserialisasi: thread analisis dan loop penerima menulis ke socket yang sama."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._lock = threading.Lock()
+
+    def send(self, payload):
+        with self._lock:
+            self.ws.send(json.dumps(payload))
+
+def _session_in_progress(session_id):
+    session_doc = get_ai_interview_collections().find_one({"_id": ObjectId(session_id)}, {"status": 1})
+    return bool(session_doc) and session_doc.get("status") == "in_progress"
+
+def _stream_analysis_worker(ws, sender, slot, session_id, session_key):
+    """Menganalisis frame terbaru dari slot dan mengirim hasilnya ke klien sampai stream atau sesi berakhir."""
+    runtime = get_detector_runtime()
+    aggregator = get_temporal_aggregator()
+    last_session_check = time.monotonic()
+    while True:
+        item = slot.get()
+        if item is None:
+            return
+        seq, payload = item
+        try:
+            if time.monotonic() - last_session_check >= STREAM_SESSION_CHECK_SECONDS:
+                last_session_check = time.monotonic()
+                if not _session_in_progress(session_id):
+                    logger.info(f"Sesi {session_id} sudah diakhiri, stream frame ditutup.")
+                    sender.send({"type": "session_ended", "session_id": session_id})
+                    ws.close(reason=1000, message="Sesi wawancara ini sudah berakhir.")
+                    return
+            frame = decode_frame_bytes(payload) if isinstance(payload, bytes) else decode_base64_frame(payload)
+            if frame is None:
+                sender.send({"type": "error", "seq": seq, "message": "Data gambar tidak valid."})
+                continue
+            face_analysis = runtime.analyze(frame, session_key=session_key)
+            aggregator.push(session_key, face_analysis)
+            sender.send({
+                "type": "analysis",
+                "seq": seq,
+                "analysis": {
+                    "pose": face_analysis["pose"],
+                    "mouth": face_analysis["mouth"],
+                    "expression": face_analysis["expression"]
+                },
+                "window": aggregator.snapshot(session_key),
+                "dropped": slot.dropped,
+                "next_frame_interval_ms": runtime.load_status()["next_frame_interval_ms"]
+            })
+        except ConnectionClosed:
+            return
+        except Exception as e:
+            logger.error(f"Error pada analisis frame stream: {e}", exc_info=False)
+            try:
+                sender.send({"type": "error", "seq": seq, "message": "Gagal menganalisis frame."})
+            except ConnectionClosed:
+                return
+
+@sock.route("/stream", bp=ai_interview_bp)
+def stream_interview_frames(ws):
+    """
+    Channel WebSocket untuk analisis frame berkelanjutan dalam satu sesi wawancara
+    (/api/ai_interview/stream?session_id=...). Autentikasi hanya dilakukan sekali
+    saat stream dibuka.
+
+    Klien mengirim frame sebagai pesan biner (JPEG/PNG) atau teks JSON
+    {"type": "frame", "frame": base64, "seq": n}; {"type": "close"} mengakhiri stream.
+    Server membalas {"type": "analysis", "seq", "analysis", "window", "dropped"}
+    setiap kali analisis selesai. Jika server tertinggal, hanya frame terbaru yang
+    dianalisis dan frame lama dibuang (dihitung di "dropped"). Jika sesi diakhiri
+    selama stream terbuka, server mengirim {"type": "session_ended"} lalu menutup stream.
+    """
+    current_user, session_id, error = _authenticate_stream(ws)
+    if error:
+        ws.send(json.dumps({"type": "error", "message": error}))
+        ws.close(reason=1008, message=error)
+        return
+
+    session_key = get_session_tracker_key(current_user, session_id)
+    sender = _StreamSender(ws)
+    sender.send({"type": "ready", "session_id": session_id})
+    logger.info(f"Stream frame dibuka untuk sesi {session_id} ({current_user['username']}).")
+
+    slot = LatestFrameSlot()
+    worker = threading.Thread(
+        target=_stream_analysis_worker, args=(ws, sender, slot, session_id, session_key),
+        name=f"stream-{session_id}", daemon=True
+    )
+    worker.start()
+    next_seq = 0
+    try:
+        while True:
+            message = ws.receive(timeout=STREAM_IDLE_TIMEOUT_SECONDS)
+            if message is None:
+                logger.info(f"Stream frame sesi {session_id} idle, ditutup.")
+                break
+            if isinstance(message, bytes):
+                slot.put((next_seq, message))
+                next_seq += 1
+                continue
+            try:
+                payload = json.loads(message)
+            except ValueError:
+                sender.send({"type": "error", "message": "Pesan tidak valid."})
+                continue
+            if payload.get('type') == 'close':
+                break
+            if payload.get('type') == 'frame' and payload.get('frame'):
+                seq = payload.get('seq', next_seq)
+                slot.put((seq, payload['frame']))
+                next_seq = (seq + 1) if isinstance(seq, int) else next_seq + 1
+    except ConnectionClosed:
+        pass
     finally:
-        # Pastikan file temporer selalu dihapus
-        if image_path and os.path.exists(image_path):
-            os.unlink(image_path)
+        slot.close()
+        worker.join(timeout=STREAM_AUTH_TIMEOUT_SECONDS)
+        logger.info(
+            f"Stream frame sesi {session_id} selesai: {slot.received} frame diterima, {slot.dropped} dibuang."
+        )
+
+@ai_interview_bp.route("/detector_stats", methods=["GET"])
+@token_required
+@require_api_key
+def get_detector_stats(current_user):
+    """
+    Statistik runtime detektor, termasuk hit/miss cache frame yang hampir identik.
+    """
+    runtime = get_detector_runtime()
+    return jsonify({
+        "status": "success",
+        "backend": runtime.backend,
+        "workers": runtime.workers,
+        "load": runtime.load_status(),
+        "frame_cache": runtime.frame_cache.stats()
+    }), 200
+
+@ai_interview_bp.route("/llm_stats", methods=["GET"])
+@token_required
+@require_api_key
+def get_llm_stats(current_user):
+    """
+    Statistik cache respons LLM (hit memori/Mongo, miss, hit rate per jenis prompt).
+    """
+    return jsonify({"status": "success", "llm_cache": get_llm_cache().stats()}), 200
 
 @ai_interview_bp.route("/process_response", methods=["POST"])
 @token_required
@@ -239,16 +632,25 @@ def analyze_realtime_frame(current_user):
 def process_ai_interview_response(current_user):
     """
     Memproses jawaban pengguna, melakukan analisis visual, dan mendapatkan umpan balik dari AI.
+    Umpan balik LLM dan analisis visual berjalan paralel; penilai lokal dipakai jika LLM melewati batas waktu.
     """
     logger.info(f"Memproses respons wawancara dari pengguna: {current_user.get('username')}")
-    data = request.get_json()
-    session_id, response_text, frame_base64, question_index = (
-        data.get('session_id'), data.get('response_text'),
-        data.get('frame'), data.get('question_index')
+    try:
+        upload = read_frame_upload()
+    except FrameUploadError as e:
+        return jsonify({"status": "fail", "message": e.message}), e.status_code
+    data = upload.fields
+    session_id, response_text, question_index = (
+        data.get('session_id'), data.get('response_text'), data.get('question_index')
     )
 
-    if not all([session_id, response_text, frame_base64 is not None, question_index is not None]):
+    if not all([session_id, response_text, question_index is not None]):
         return jsonify({"status": "fail", "message": "Data tidak lengkap untuk memproses respons."}), 400
+    try:
+        # Field form multipart selalu berupa string
+        question_index = int(question_index)
+    except (TypeError, ValueError):
+        return jsonify({"status": "fail", "message": "Indeks pertanyaan tidak valid."}), 400
 
     try:
         session_obj_id = ObjectId(session_id)
@@ -261,44 +663,87 @@ def process_ai_interview_response(current_user):
         if question_index >= len(session_doc.get('questions_asked', [])):
             return jsonify({"status": "fail", "message": "Indeks pertanyaan tidak valid."}), 400
 
-        # --- 1. Analisis Visual ---
-        image_path = None
+        # Mode deferred: umpan balik per jawaban dibuat sekaligus saat end_session
+        deferred = session_doc.get("feedback_mode") == "deferred"
+        feedback_future = None
+        started = time.perf_counter()
+        current_question_text = session_doc['questions_asked'][question_index]['question']
+        keywords = topic_keywords(session_doc)
+        if not deferred:
+            provider = get_llm_provider()
+            if provider.available():
+                # --- 1. Umpan balik AI dimulai lebih dulu di executor LLM, paralel dengan analisis visual ---
+                feedback_future = submit_timed(
+                    get_realtime_feedback, provider, current_question_text, response_text, keywords
+                )
+
+        # --- 2. Analisis Visual ---
+        # Jika /analyze_frame baru saja mengisi jendela temporal sesi ini, hasilnya
+        # dipakai langsung tanpa inferensi ulang; frame pada request ini hanya
+        # dianalisis (di runtime detektor, dibatasi DETECTOR_TIMEOUT_SECONDS) bila jendela basi.
         visual_analysis = {"pose": "tidak terdeteksi", "mouth": "tidak terdeteksi", "expression": "tidak terdeteksi"}
-        
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-                image_path = tmp.name
-                tmp.write(base64.b64decode(frame_base64))
-            
-            visual_analysis = {
-                "pose": detect_pose_status(image_path),
-                "mouth": detect_mouth_status(image_path),
-                "expression": detect_facial_expression(image_path)
-            }
-            logger.debug(f"Hasil analisis visual untuk sesi {session_id}: {visual_analysis}")
-        except Exception as e:
-            logger.error(f"Gagal melakukan analisis visual pada gambar: {e}", exc_info=True)
-        finally:
-            if image_path and os.path.exists(image_path):
-                os.unlink(image_path)
+        session_key = get_session_tracker_key(current_user, session_id)
+        aggregator = get_temporal_aggregator()
+        visual_window = aggregator.fresh_snapshot(session_key, ANALYSIS_WINDOW_FRESH_SECONDS)
+        visual_source = "window"
 
-        # --- 2. Analisis Jawaban dengan AI (Hanya untuk Umpan Balik) ---
-        model = get_gemini_model()
-        if not model:
-            return jsonify({"status": "error", "message": "Layanan AI tidak tersedia."}), 500
+        if visual_window is None:
+            visual_source = "frame" if upload.frame is not None else "none"
+            try:
+                if upload.frame is None:
+                    logger.warning(f"Tidak ada frame valid untuk sesi {session_id}, analisis visual memakai jendela yang tersisa.")
+                else:
+                    face_analysis = get_detector_runtime().analyze(upload.frame, session_key=session_key)
+                    aggregator.push(session_key, face_analysis)
+                    visual_analysis = {
+                        "pose": face_analysis["pose"],
+                        "mouth": face_analysis["mouth"],
+                        "expression": face_analysis["expression"]
+                    }
+                    logger.debug(f"Hasil analisis visual untuk sesi {session_id}: {visual_analysis}")
+            except Exception as e:
+                logger.error(f"Gagal melakukan analisis visual pada gambar: {e}", exc_info=True)
+            # Gunakan jendela temporal (frame dari /analyze_frame selama menjawab + frame ini)
+            # agar skor tidak bergantung pada satu frame saja
+            visual_window = aggregator.snapshot(session_key)
+
+        if visual_window and visual_window["frames"]:
+            visual_analysis = {category: visual_window[category]["smoothed"] for category in ("pose", "mouth", "expression")}
+        pose_distribution, expression_distribution = visual_distributions(visual_window, visual_analysis)
+        visual_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        # --- Gabungkan: tunggu umpan balik AI, sisa waktunya dihitung dari awal request ---
+        real_time_feedback = None
+        feedback_source = None
+        timings = {"visual_ms": visual_ms}
+        if feedback_future is not None:
+            try:
+                remaining = max(0.0, LLM_FEEDBACK_DEADLINE_SECONDS - (time.perf_counter() - started))
+                (real_time_feedback, llm_cache_source), llm_timing = feedback_future.result(timeout=remaining)
+                feedback_source = "cache" if llm_cache_source else "llm"
+                timings.update({
+                    "llm_ms": llm_timing["run_ms"],
+                    "llm_queue_ms": llm_timing["queue_ms"],
+                    "llm_cache": llm_cache_source,
+                })
+            except FuturesTimeoutError:
+                feedback_future.cancel()
+                logger.warning(f"Umpan balik LLM untuk sesi {session_id} melewati batas {LLM_FEEDBACK_DEADLINE_SECONDS} detik, memakai penilai lokal.")
+            except LLMError as e:
+                logger.warning(f"Umpan balik LLM untuk sesi {session_id} gagal, memakai penilai lokal: {e}")
+            except Exception as e:
+                logger.error(f"Umpan balik LLM untuk sesi {session_id} gagal, memakai penilai lokal: {e}", exc_info=True)
+        if real_time_feedback is None and not deferred:
+            # Hasil fallback tidak disimpan ke cache LLM agar panggilan berikutnya tetap mencoba LLM
+            real_time_feedback = local_answer_feedback(current_question_text, response_text, keywords)
+            feedback_source = "local_fallback"
+        timings["feedback_source"] = feedback_source
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.debug(f"Timing respons sesi {session_id}: {timings}")
 
-        current_question_text = session_doc['questions_asked'][question_index]['question']
-        feedback_prompt = f"""
-        Anda adalah seorang HRD profesional. Berikan umpan balik singkat (1-2 kalimat) yang konstruktif untuk jawaban kandidat.
-        Pertanyaan: "{current_question_text}"
-        Jawaban Kandidat: "{response_text}"
-        Fokus pada kejelasan, relevansi, dan struktur jawaban. Output HANYA teks umpan balik.
-        """
-        response_from_gemini = model.generate_content(feedback_prompt)
-        real_time_feedback = response_from_gemini.text.strip()
-        
         # --- 3. Kalkulasi Skor Kepercayaan Diri ---
-        confidence = calculate_confidence_score(visual_analysis['pose'], visual_analysis['expression'], real_time_feedback)
+        # Pada mode deferred skor sementara hanya dari isyarat visual; dihitung ulang saat end_session
+        confidence = calculate_confidence_score(pose_distribution, expression_distribution, real_time_feedback or "")
         
         # --- 4. Update Database ---
         update_prefix = f"questions_asked.{question_index}"
@@ -306,7 +751,9 @@ def process_ai_interview_response(current_user):
             f"{update_prefix}.response": response_text,
             f"{update_prefix}.timestamp_responded": datetime.datetime.utcnow(),
             f"{update_prefix}.feedback_realtime": real_time_feedback,
+            f"{update_prefix}.feedback_source": feedback_source,
             f"{update_prefix}.visual_analysis": visual_analysis,
+            f"{update_prefix}.visual_window": visual_window,
             f"{update_prefix}.confidence_score": confidence['score'],
             f"{update_prefix}.confidence_feedback": confidence['summary'],
             # Simpan deteksi individual jika diperlukan untuk analisis lebih lanjut
@@ -314,6 +761,8 @@ def process_ai_interview_response(current_user):
             f"{update_prefix}.mouth_detection": visual_analysis['mouth']
         }}
         get_ai_interview_collections().update_one({"_id": session_obj_id}, update_operation)
+        # Jendela dimulai ulang untuk jawaban berikutnya
+        aggregator.reset(session_key)
 
         is_last_question = (question_index + 1) >= len(session_doc['questions_asked'])
         
@@ -322,9 +771,14 @@ def process_ai_interview_response(current_user):
             "message": "Respon berhasil diproses.",
             "real_time_feedback": real_time_feedback,
             "visual_analysis": visual_analysis,
+            "visual_window": visual_window,
             "confidence": confidence['score'],
             "confidence_feedback": confidence['summary'],
-            "is_session_completed": is_last_question
+            "is_session_completed": is_last_question,
+            "feedback_deferred": deferred,
+            "feedback_source": feedback_source,
+            "visual_source": visual_source,
+            "timings": timings
         }), 200
 
     except errors.InvalidId:
@@ -334,99 +788,351 @@ def process_ai_interview_response(current_user):
         return jsonify({"status": "error", "message": f"Terjadi kesalahan internal saat memproses jawaban: {str(e)}"}), 500
 
 
-@ai_interview_bp.route("/end_session", methods=["POST"])
-@token_required
-@require_api_key
-def end_ai_interview_session(current_user):
+# ==============================================================================
+# AKHIR SESI: prompt, metrik agregat, dan penyimpanan hasil akhir
+# ==============================================================================
+def build_overall_feedback_prompt(session_doc):
+    conversation_history = []
+    for qa in session_doc.get('questions_asked', []):
+        if qa.get('question') and qa.get('response'):
+            conversation_history.append(f"Pewawancara: {qa['question']}")
+            conversation_history.append(f"Kandidat: {qa['response']}\n")
+    
+    full_conversation_text = "\n".join(conversation_history)
+    
+    return f"""
+    Anda adalah seorang manajer HRD yang memberikan umpan balik akhir setelah wawancara.
+    Analisis seluruh percakapan berikut:
+    ---
+    {full_conversation_text}
+    ---
+    Berikan umpan balik menyeluruh yang mencakup:
+    1.  Kekuatan utama kandidat.
+    2.  Area yang perlu ditingkatkan.
+    3.  Saran konkret untuk perbaikan di masa depan.
+    Buatlah dalam format paragraf yang mudah dibaca dan profesional.
+    """
+
+def calculate_session_metrics(session_doc, end_time):
+    all_confidence_scores = [qa['confidence_score'] for qa in session_doc.get('questions_asked', []) if qa.get('confidence_score') is not None]
+    total_speaking_instances = sum(1 for qa in session_doc.get('questions_asked', []) if qa.get('mouth_detection') == 'bicara')
+    total_leaning_instances = sum(1 for qa in session_doc.get('questions_asked', []) if qa.get('pose_detection') in ['miring', 'miring_kiri', 'miring_kanan'])
+    
+    return {
+        "average_confidence_score": sum(all_confidence_scores) / len(all_confidence_scores) if all_confidence_scores else 0,
+        "total_duration_seconds": int((end_time - session_doc['timestamp']).total_seconds()),
+        "total_speaking_instances": total_speaking_instances,
+        "total_leaning_instances": total_leaning_instances
+    }
+
+def generate_deferred_feedback(provider, session_doc):
     """
-    Mengakhiri sesi wawancara, menghasilkan umpan balik keseluruhan, dan menghitung metrik akhir.
+    Mode deferred: satu panggilan LLM berformat JSON untuk umpan balik setiap
+    jawaban sekaligus ringkasan keseluruhan. Mengembalikan
+    (teks_keseluruhan, {indeks_pertanyaan: umpan_balik}).
     """
-    logger.info(f"Permintaan mengakhiri sesi wawancara oleh pengguna: {current_user.get('username')}")
-    data = request.get_json()
+    answered = {
+        index: qa for index, qa in enumerate(session_doc.get('questions_asked', []))
+        if qa.get('question') and qa.get('response')
+    }
+    transcript = "\n".join(
+        f'{index}. Pertanyaan: "{qa["question"]}"\n   Jawaban Kandidat: "{qa["response"]}"'
+        for index, qa in answered.items()
+    )
+    prompt = f"""
+    Anda adalah seorang manajer HRD profesional. Berikut seluruh jawaban kandidat dalam satu sesi wawancara,
+    masing-masing diawali nomor indeksnya:
+    ---
+    {transcript}
+    ---
+    Tugas Anda:
+    1. Untuk setiap jawaban, berikan umpan balik singkat (1-2 kalimat) yang konstruktif, fokus pada kejelasan, relevansi, dan struktur jawaban.
+    2. Berikan umpan balik menyeluruh dalam format paragraf yang mudah dibaca dan profesional, mencakup kekuatan utama kandidat,
+       area yang perlu ditingkatkan, dan saran konkret untuk perbaikan di masa depan.
+    Output HANYA objek JSON valid dengan format:
+    {{"answers": [{{"index": <nomor indeks>, "feedback": "<umpan balik>"}}], "overall_feedback": "<umpan balik menyeluruh>"}}
+    """
+    response_text = provider.generate(
+        prompt, "batch_feedback",
+        context={"answers": {index: (qa["question"], qa["response"]) for index, qa in answered.items()}},
+        json_output=True
+    )
+    result = json.loads(response_text)
+    overall_feedback_text = result.get("overall_feedback") if isinstance(result, dict) else None
+    if not isinstance(overall_feedback_text, str) or not overall_feedback_text.strip():
+        raise ValueError("AI tidak mengembalikan umpan balik keseluruhan yang valid.")
+
+    feedback_by_index = {}
+    for item in result.get("answers") or []:
+        if not isinstance(item, dict):
+            continue
+        feedback = item.get("feedback")
+        # Output JSON model kadang menulis indeks sebagai string ("0")
+        try:
+            index = int(item.get("index"))
+        except (ValueError, TypeError):
+            continue
+        if index in answered and isinstance(feedback, str) and feedback.strip():
+            feedback_by_index[index] = feedback.strip()
+    missing = sorted(set(answered) - set(feedback_by_index))
+    if missing:
+        logger.warning(f"Umpan balik batch tidak mencakup jawaban indeks {missing}.")
+    return overall_feedback_text.strip(), feedback_by_index
+
+def backfill_answer_feedback(session_doc, feedback_by_index):
+    """
+    Mengisi feedback_realtime dan menghitung ulang skor kepercayaan diri setiap
+    jawaban dengan umpan balik batch. session_doc ikut diperbarui (agar metrik
+    akhir memakai skor baru); mengembalikan field $set untuk Mongo.
+    """
+    updates = {}
+    for index, feedback in feedback_by_index.items():
+        qa = session_doc['questions_asked'][index]
+        pose_distribution, expression_distribution = visual_distributions(qa.get('visual_window'), qa.get('visual_analysis'))
+        confidence = calculate_confidence_score(pose_distribution, expression_distribution, feedback)
+        qa.update(feedback_realtime=feedback, confidence_score=confidence['score'], confidence_feedback=confidence['summary'])
+        update_prefix = f"questions_asked.{index}"
+        updates[f"{update_prefix}.feedback_realtime"] = feedback
+        updates[f"{update_prefix}.confidence_score"] = confidence['score']
+        updates[f"{update_prefix}.confidence_feedback"] = confidence['summary']
+    return updates
+
+def answered_pairs(session_doc):
+    """Pasangan (pertanyaan, jawaban) yang sudah dijawab, context untuk task "overall_feedback"."""
+    return [(qa['question'], qa['response']) for qa in session_doc.get('questions_asked', []) if qa.get('question') and qa.get('response')]
+
+def generate_session_feedback(provider, session_doc):
+    """
+    Umpan balik akhir sesi sesuai feedback_mode: (teks_keseluruhan, field $set
+    tambahan). Mode deferred sekaligus mengisi umpan balik tiap jawaban.
+    """
+    if session_doc.get("feedback_mode") == "deferred":
+        overall_feedback_text, feedback_by_index = generate_deferred_feedback(provider, session_doc)
+        return overall_feedback_text, backfill_answer_feedback(session_doc, feedback_by_index)
+    overall_feedback_text = provider.generate(
+        build_overall_feedback_prompt(session_doc), "overall_feedback", context={"answers": answered_pairs(session_doc)}
+    )
+    return overall_feedback_text.strip(), {}
+
+def complete_session(session_id, overall_feedback_text, metrics, end_time, extra_updates=None):
+    get_ai_interview_collections().update_one(
+        {"_id": ObjectId(session_id)},
+        {"$set": {
+            "status": "completed",
+            "overall_feedback": overall_feedback_text,
+            **metrics,
+            **(extra_updates or {}),
+            "timestamp_ended": end_time
+        }}
+    )
+    logger.info(f"Sesi wawancara AI {session_id} telah selesai.")
+
+def release_session_state(current_user, session_id):
+    """Melepas tracker FaceMesh dan jendela temporal sesi di proses web."""
+    get_detector_runtime().release_session(get_session_tracker_key(current_user, session_id))
+    get_temporal_aggregator().reset(get_session_tracker_key(current_user, session_id))
+
+def finalizing_response(session_id, job_id):
+    return jsonify({
+        "status": "finalizing",
+        "message": "Sesi sedang difinalisasi. Pantau progresnya lewat detail sesi.",
+        "session_id": session_id,
+        "job_id": job_id,
+        "status_url": f"{ai_interview_bp.url_prefix}/session/{session_id}"
+    }), 202
+
+def finalize_session_job(payload, progress):
+    """
+    Handler job "finalize_session" (dijalankan job_worker.py atau worker embedded):
+    umpan balik keseluruhan dari LLM, metrik agregat, lalu update dokumen sesi.
+    """
+    session_id = payload["session_id"]
+    session_doc = get_ai_interview_collections().find_one({"_id": ObjectId(session_id)})
+    if not session_doc or session_doc.get("status") != "finalizing":
+        logger.info(f"Sesi {session_id} tidak dalam status finalizing, job finalisasi dilewati.")
+        return
+
+    provider = get_llm_provider()
+    if not provider.available():
+        raise RuntimeError("Layanan AI tidak tersedia untuk memberikan ringkasan.")
+    progress("generating_feedback")
+    overall_feedback_text, answer_updates = generate_session_feedback(provider, session_doc)
+
+    progress("saving")
+    end_time = session_doc.get("timestamp_end_requested") or datetime.datetime.utcnow()
+    complete_session(
+        session_id, overall_feedback_text, calculate_session_metrics(session_doc, end_time), end_time, answer_updates
+    )
+
+def claim_session_for_finalizing(session_id):
+    """Transisi atomik in_progress -> finalizing; False jika request lain sudah mengakhiri sesi ini."""
+    return get_ai_interview_collections().find_one_and_update(
+        {"_id": ObjectId(session_id), "status": "in_progress"},
+        {"$set": {"status": "finalizing", "timestamp_end_requested": datetime.datetime.utcnow()},
+         "$unset": {"finalize_error": "", "finalize_job_id": ""}}
+    ) is not None
+
+def revert_finalizing(session_id, error):
+    # Finalisasi gagal: sesi dikembalikan ke in_progress agar pengguna bisa mengakhirinya lagi
+    get_ai_interview_collections().update_one(
+        {"_id": ObjectId(session_id), "status": "finalizing"},
+        {"$set": {"status": "in_progress", "finalize_error": error}}
+    )
+
+def finalize_session_failed(payload, error):
+    revert_finalizing(payload["session_id"], error)
+
+register_job_handler("finalize_session", finalize_session_job, on_failure=finalize_session_failed)
+
+def _find_session_to_end(current_user):
+    """
+    Validasi bersama /end_session dan /end_session/stream. Mengembalikan
+    (session_id, session_doc, None) atau (None, None, respons untuk klien).
+    """
+    data = request.get_json(silent=True) or {}
     session_id = data.get('session_id')
 
     if not session_id:
-        return jsonify({"status": "fail", "message": "ID Sesi diperlukan."}), 400
+        return None, None, (jsonify({"status": "fail", "message": "ID Sesi diperlukan."}), 400)
 
     try:
         session_obj_id = ObjectId(session_id)
-        session_doc = get_ai_interview_collections().find_one({"_id": session_obj_id, "user_id": current_user['_id']})
+    except errors.InvalidId:
+        return None, None, (jsonify({"status": "fail", "message": "Format ID sesi tidak valid."}), 400)
+    session_doc = get_ai_interview_collections().find_one({"_id": session_obj_id, "user_id": current_user['_id']})
 
-        if not session_doc:
-            return jsonify({"status": "fail", "message": "Sesi wawancara tidak ditemukan."}), 404
-        if session_doc.get("status") == "completed":
-            return jsonify({"status": "info", "message": "Sesi ini sudah pernah diakhiri."}), 200
+    if not session_doc:
+        return None, None, (jsonify({"status": "fail", "message": "Sesi wawancara tidak ditemukan."}), 404)
+    if session_doc.get("status") == "completed":
+        return None, None, (jsonify({"status": "info", "message": "Sesi ini sudah pernah diakhiri."}), 200)
+    if session_doc.get("status") == "finalizing":
+        return None, None, finalizing_response(session_id, session_doc.get("finalize_job_id"))
+    return session_id, session_doc, None
 
-        # --- 1. Hasilkan Umpan Balik Keseluruhan dari AI ---
-        model = get_gemini_model()
-        if not model:
-            return jsonify({"status": "error", "message": "Layanan AI tidak tersedia untuk memberikan ringkasan."}), 500
+@ai_interview_bp.route("/end_session", methods=["POST"])
+@token_required
+@require_api_key
+def end_ai_interview_session(current_user):
+    """
+    Mengakhiri sesi wawancara: job finalisasi dimasukkan ke antrean dan respons 202 dikembalikan.
+    """
+    logger.info(f"Permintaan mengakhiri sesi wawancara oleh pengguna: {current_user.get('username')}")
+    try:
+        session_id, session_doc, error_response = _find_session_to_end(current_user)
+        if error_response:
+            return error_response
 
-        conversation_history = []
-        for qa in session_doc.get('questions_asked', []):
-            if qa.get('question') and qa.get('response'):
-                conversation_history.append(f"Pewawancara: {qa['question']}")
-                conversation_history.append(f"Kandidat: {qa['response']}\n")
-        
-        full_conversation_text = "\n".join(conversation_history)
-        
-        overall_feedback_prompt = f"""
-        Anda adalah seorang manajer HRD yang memberikan umpan balik akhir setelah wawancara.
-        Analisis seluruh percakapan berikut:
-        ---
-        {full_conversation_text}
-        ---
-        Berikan umpan balik menyeluruh yang mencakup:
-        1.  Kekuatan utama kandidat.
-        2.  Area yang perlu ditingkatkan.
-        3.  Saran konkret untuk perbaikan di masa depan.
-        Buatlah dalam format paragraf yang mudah dibaca dan profesional.
-        """
-        
-        overall_feedback_response = model.generate_content(overall_feedback_prompt)
-        overall_feedback_text = overall_feedback_response.text.strip()
+        # Request ganda (atau /end_session/stream yang berjalan) tidak membuat job kedua
+        collection = get_ai_interview_collections()
+        if not claim_session_for_finalizing(session_id):
+            current = collection.find_one({"_id": ObjectId(session_id)}, {"finalize_job_id": 1})
+            return finalizing_response(session_id, current.get("finalize_job_id") if current else None)
 
-        # --- 2. Hitung Metrik Agregat ---
-        all_confidence_scores = [qa['confidence_score'] for qa in session_doc.get('questions_asked', []) if qa.get('confidence_score') is not None]
-        total_speaking_instances = sum(1 for qa in session_doc.get('questions_asked', []) if qa.get('mouth_detection') == 'bicara')
-        total_leaning_instances = sum(1 for qa in session_doc.get('questions_asked', []) if qa.get('pose_detection') in ['miring_kiri', 'miring_kanan'])
-        
-        average_confidence = sum(all_confidence_scores) / len(all_confidence_scores) if all_confidence_scores else 0
-        end_time = datetime.datetime.utcnow()
-        total_duration_seconds = int((end_time - session_doc['timestamp']).total_seconds())
-
-        # --- 3. Update Database ---
-        get_ai_interview_collections().update_one(
-            {"_id": session_obj_id},
-            {"$set": {
-                "status": "completed",
-                "overall_feedback": overall_feedback_text,
-                "total_duration_seconds": total_duration_seconds,
-                "average_confidence_score": average_confidence,
-                "total_speaking_instances": total_speaking_instances,
-                "total_leaning_instances": total_leaning_instances,
-                "timestamp_ended": end_time
-            }}
-        )
-        logger.info(f"Sesi wawancara AI {session_id} untuk {current_user['username']} telah selesai.")
-        
-        return jsonify({
-            "status": "success",
-            "message": "Sesi wawancara berhasil diakhiri.",
-            "overall_feedback": overall_feedback_text,
-            "average_confidence_score": average_confidence,
-            "total_duration_seconds": total_duration_seconds,
-            "total_speaking_instances": total_speaking_instances,
-            "total_leaning_instances": total_leaning_instances
-        }), 200
+        try:
+            job_id = enqueue("finalize_session", {"session_id": session_id})
+        except Exception:
+            collection.update_one({"_id": ObjectId(session_id)}, {"$set": {"status": "in_progress"}})
+            raise
+        collection.update_one({"_id": ObjectId(session_id)}, {"$set": {"finalize_job_id": job_id}})
+        release_session_state(current_user, session_id)
+        logger.info(f"Job finalisasi {job_id} untuk sesi {session_id} dimasukkan ke antrean.")
+        return finalizing_response(session_id, job_id)
 
-    except errors.InvalidId:
-        return jsonify({"status": "fail", "message": "Format ID sesi tidak valid."}), 400
     except Exception as e:
         logger.error(f"Error saat mengakhiri sesi wawancara: {e}", exc_info=True)
         return jsonify({"status": "error", "message": f"Terjadi kesalahan internal saat mengakhiri sesi: {str(e)}"}), 500
 
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@ai_interview_bp.route("/end_session/stream", methods=["POST"])
+@token_required
+@require_api_key
+def end_ai_interview_session_stream(current_user):
+    """
+    Varian /end_session yang mengirim umpan balik keseluruhan sambil dihasilkan lewat
+    server-sent events: "metrics", lalu "chunk" berulang, dan "done" atau "error".
+    """
+    logger.info(f"Permintaan streaming akhir sesi wawancara oleh pengguna: {current_user.get('username')}")
+    session_id, session_doc, error_response = _find_session_to_end(current_user)
+    if error_response:
+        return error_response
+    provider = get_llm_provider()
+    if not provider.available():
+        return jsonify({"status": "error", "message": "Layanan AI tidak tersedia untuk memberikan ringkasan."}), 500
+    # Klaim yang sama dengan /end_session: hanya satu request yang membuat umpan balik akhir
+    if not claim_session_for_finalizing(session_id):
+        current = get_ai_interview_collections().find_one({"_id": ObjectId(session_id)}, {"finalize_job_id": 1})
+        return finalizing_response(session_id, current.get("finalize_job_id") if current else None)
+
+    end_time = datetime.datetime.utcnow()
+    metrics = calculate_session_metrics(session_doc, end_time)
+    deferred = session_doc.get("feedback_mode") == "deferred"
 
+    def generate():
+        parts = []
+        chunks = None
+        result = None
+        failed = False
+
+        def persist():
+            if deferred:
+                overall_feedback_text, answer_updates = generate_session_feedback(provider, session_doc)
+                final_metrics = calculate_session_metrics(session_doc, end_time)
+            else:
+                # Sisa stream (atau seluruhnya, jika klien terputus sebelum stream dimulai) dibaca di sini
+                parts.extend(chunks if chunks is not None else provider.stream(
+                    build_overall_feedback_prompt(session_doc), "overall_feedback",
+                    context={"answers": answered_pairs(session_doc)}
+                ))
+                overall_feedback_text, answer_updates, final_metrics = "".join(parts).strip(), None, metrics
+            complete_session(session_id, overall_feedback_text, final_metrics, end_time, answer_updates)
+            release_session_state(current_user, session_id)
+            return overall_feedback_text, final_metrics
+
+        try:
+            yield _sse_event("metrics", metrics)
+            if not deferred:
+                chunks = iter(provider.stream(
+                    build_overall_feedback_prompt(session_doc), "overall_feedback",
+                    context={"answers": answered_pairs(session_doc)}
+                ))
+                for text in chunks:
+                    parts.append(text)
+                    yield _sse_event("chunk", {"text": text})
+            result = persist()
+            overall_feedback_text, final_metrics = result
+            if deferred:
+                yield _sse_event("chunk", {"text": overall_feedback_text})
+            yield _sse_event("done", {
+                "status": "success",
+                "message": "Sesi wawancara berhasil diakhiri.",
+                "overall_feedback": overall_feedback_text,
+                **final_metrics
+            })
+        except GeneratorExit:
+            logger.info(f"Klien memutus stream akhir sesi {session_id}, menyelesaikan generasi di server.")
+            raise
+        except Exception as e:
+            failed = True
+            logger.error(f"Error saat streaming akhir sesi wawancara: {e}", exc_info=True)
+            revert_finalizing(session_id, str(e))
+            yield _sse_event("error", {"status": "error", "message": f"Terjadi kesalahan internal saat mengakhiri sesi: {str(e)}"})
+        finally:
+            # Klien terputus di titik mana pun sebelum hasil tersimpan: generasi diselesaikan tanpa mengirim event
+            if result is None and not failed:
+                try:
+                    persist()
+                except Exception as e:
+                    logger.error(f"Gagal menyimpan akhir sesi {session_id} setelah klien terputus: {e}", exc_info=True)
+                    revert_finalizing(session_id, str(e))
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        # Nonaktifkan buffering proxy (nginx) agar setiap event langsung terkirim
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @ai_interview_bp.route("/history", methods=["GET"])
@@ -479,6 +1185,10 @@ def get_ai_interview_session_details(current_user, session_id):
         session_doc['user_id'] = str(session_doc['user_id'])
         if 'timestamp' in session_doc: session_doc['timestamp'] = session_doc['timestamp'].isoformat()
         if 'timestamp_ended' in session_doc: session_doc['timestamp_ended'] = session_doc['timestamp_ended'].isoformat()
+        if 'timestamp_end_requested' in session_doc: session_doc['timestamp_end_requested'] = session_doc['timestamp_end_requested'].isoformat()
+        # Progres job finalisasi dari /end_session (status, tahap, percobaan, error)
+        if session_doc.get('finalize_job_id'):
+            session_doc['finalization'] = get_job(session_doc['finalize_job_id'])
         
         for qa in session_doc.get('questions_asked', []):
             if 'timestamp_responded' in qa and qa['timestamp_responded']:
@@ -5,10 +5,10 @@ from database import get_collections
 from auth_decorators import token_required, require_api_key
 from config import hrd_question_details, hrd_questions_list
 from datetime import datetime
-from nltk.tokenize import word_tokenize
 import random
 import pymongo.errors
 import logging
+from local_scorer import score_answer
 
 hrd_bp = Blueprint('hrd_bp', __name__)
 logger = logging.getLogger(__name__)
@@ -67,112 +67,36 @@ def analyze_hrd_response(current_user):
                 "score": 0
             }), 400
 
-        score = 0
-        feedback_message = ""
-        expression = "neutral"
-
         logger.debug(f"HRD Analysis Input - Question: '{current_question_text}', Text: '{transcribed_text[:50]}...', Time: {response_time}s")
 
-        if not transcribed_text or len(transcribed_text.split()) < 3:
-            if response_time >= 29:
-                feedback_message = "Waktu habis dan Anda tidak memberikan jawaban yang cukup."
-                expression = "bored"
-                score = 5
-            else:
-                feedback_message = "Jawaban Anda terlalu singkat. Mohon berikan jawaban yang lebih lengkap dan jelas."
-                expression = "confused"
-                score = 10
+        question_criteria = hrd_question_details.get(current_question_text, {})
+        keywords = question_criteria.get("keywords", [])
+        result = score_answer(
+            transcribed_text, response_time,
+            keywords=keywords, ideal_length=question_criteria.get("ideal_length", 15)
+        )
 
-            logger.debug(f"HRD Analysis: Short/Empty answer. Score: {score}, Feedback: {feedback_message}")
+        if result["short_answer"]:
+            logger.debug(f"HRD Analysis: Short/Empty answer. Score: {result['score']}, Feedback: {result['feedback']}")
             return jsonify({
                 "status": "success",
-                "feedback": feedback_message,
-                "expression": expression,
-                "score": score,
-                "metrics": {"response_time": response_time, "word_count": len(transcribed_text.split()), "transcribed_text_received": transcribed_text}
+                "feedback": result["feedback"],
+                "expression": result["expression"],
+                "score": result["score"],
+                "metrics": {"response_time": response_time, "word_count": result["word_count"], "transcribed_text_received": transcribed_text}
             })
 
-        words = word_tokenize(transcribed_text.lower())
-        num_words = len(words)
-
-        question_criteria = hrd_question_details.get(current_question_text, {})
-        ideal_len = question_criteria.get("ideal_length", 15)
-        keywords = question_criteria.get("keywords", [])
-
-        base_score_length = 0
-        if num_words < ideal_len * 0.4:
-            feedback_message += "Jawaban Anda masih terlalu singkat. Coba elaborasi lebih lanjut. "
-            base_score_length = 20
-            expression = "confused"
-        elif num_words < ideal_len * 0.7:
-            feedback_message += "Jawaban Anda cukup baik, namun bisa lebih detail. "
-            base_score_length = 40
-            expression = "neutral"
-        elif num_words < ideal_len * 1.5:
-            feedback_message += "Panjang jawaban Anda sudah baik dan cukup komprehensif. "
-            base_score_length = 60
-            expression = "neutral"
-        else:
-            feedback_message += "Jawaban Anda sangat detail. Pastikan tetap fokus pada inti pertanyaan. "
-            base_score_length = 50
-            expression = "happy"
-
-        score += base_score_length
-
-        matched_keywords_count = 0
-        if keywords:
-            unique_answer_words = set(words)
-            for kw in keywords:
-                if kw in unique_answer_words:
-                    matched_keywords_count += 1
-
-            keyword_score_bonus = 0
-            if matched_keywords_count == 0 and num_words > 5:
-                feedback_message += "Namun, jawaban Anda sepertinya kurang menyentuh poin-poin kunci yang diharapkan. "
-                score = max(15, score - 15)
-                if expression == "happy": expression = "confused"
-            elif matched_keywords_count > 0 and matched_keywords_count <= len(keywords) / 2:
-                feedback_message += "Beberapa poin penting sudah Anda sebutkan. "
-                keyword_score_bonus = 15
-                if expression == "confused": expression = "neutral"
-            elif matched_keywords_count > len(keywords) / 2:
-                feedback_message += "Anda berhasil menyoroti banyak poin kunci dengan baik! "
-                keyword_score_bonus = 30
-                expression = "happy"
-
-            score += keyword_score_bonus
-        else:
-            feedback_message += "Pertanyaan ini tidak memiliki kata kunci spesifik untuk dinilai. Penilaian berdasarkan kejelasan dan kelengkapan. "
-            if score < 50 and num_words > ideal_len * 0.7 :
-                score = max(score, 50)
-                expression = "neutral" if expression == "confused" else expression
-
-        if response_time < 3 and num_words < ideal_len * 0.5:
-            feedback_message += "Anda menjawab sangat cepat, mungkin kurang dipertimbangkan. "
-            score = max(10, score - 20)
-            expression = "confused"
-
-        score = min(max(0, score), 100)
-
-        if expression == "neutral" or expression == "confused":
-            if score >= 75:
-                expression = "happy"
-            elif score >= 50:
-                expression = "neutral"
-            else:
-                expression = "confused"
-
-        logger.debug(f"HRD Analysis Result - Score: {score}, Expression: {expression}, Feedback: {feedback_message.strip()}")
+        logger.debug(f"HRD Analysis Result - Score: {result['score']}, Expression: {result['expression']}, Feedback: {result['feedback']}")
         return jsonify({
             "status": "success",
-            "feedback": feedback_message.strip() if feedback_message else "Jawaban Anda telah diterima.",
-            "expression": expression,
-            "score": score,
+            "feedback": result["feedback"],
+            "expression": result["expression"],
+            "score": result["score"],
             "metrics": {
                 "response_time": response_time,
-                "word_count": num_words,
+                "word_count": result["word_count"],
                 "transcribed_text_received": transcribed_text,
-                "matched_keywords": matched_keywords_count if keywords else "N/A",
+                "matched_keywords": result["matched_keywords"] if keywords else "N/A",
                 "total_keywords_expected": len(keywords) if keywords else "N/A"
             }
         })
@@ -3,17 +3,11 @@ from flask import Blueprint, request, jsonify
 from database import get_collections
 from auth_decorators import token_required, require_api_key
 from datetime import datetime
-import cv2
-import tempfile
-import base64
-import numpy as np
-import os
 import logging
 
-# Assuming these are actual files in the detectors directory
-from detectors.emotion_detector import detect_emotion_status
-from detectors.mouth_detector import detect_mouth_status
-from detectors.pose_detector import detect_pose_status
+from frame_upload import FrameUploadError, detector_backpressure, read_frame_upload
+# Single-pass analysis (one FaceMesh inference) scheduled on the detector runtime
+from detectors.runtime import get_detector_runtime
 
 narration_bp = Blueprint('narration_bp', __name__)
 logger = logging.getLogger(__name__)
@@ -26,32 +20,34 @@ def get_narration_collections():
 @narration_bp.route("/analyze_realtime", methods=["POST"])
 @token_required
 @require_api_key
+@detector_backpressure
 def analyze_realtime(current_user):
     logger.info(f"Analyze realtime endpoint hit by user: {current_user.get('username')}")
-    data = request.get_json()
+    # Accepts JSON {"frame": base64}, multipart/form-data (file "frame") or a raw image/jpeg body
+    try:
+        upload = read_frame_upload()
+    except FrameUploadError as e:
+        logger.warning(f"Rejected analyze_realtime upload: {e.message}")
+        return jsonify({"status": "fail", "message": e.message}), e.status_code
 
-    if "frame" not in data:
+    if not upload.provided:
         logger.warning("Frame not provided in analyze_realtime request.")
         return jsonify({"status": "fail", "message": "Frame not provided"}), 400
 
     try:
-        img_data = base64.b64decode(data["frame"])
-        np_arr = np.frombuffer(img_data, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        # Decoded once in memory; the analyzer consumes the ndarray directly
+        frame = upload.frame
 
         if frame is None:
             logger.warning("Invalid image data received in analyze_realtime.")
             return jsonify({"status": "fail", "message": "Invalid image data"}), 400
 
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
-            image_path = tmp_file.name
-            cv2.imwrite(image_path, frame)
-
-        emotion_result = detect_emotion_status(image_path)
-        mouth_result = detect_mouth_status(image_path)
-        pose_result = detect_pose_status(image_path)
-
-        os.unlink(image_path) # Clean up temp file
+        # Keyed per user so consecutive narration frames reuse tracking and the near-duplicate cache
+        runtime = get_detector_runtime()
+        face_analysis = runtime.analyze(frame, session_key=f"narration:{current_user['_id']}")
+        emotion_result = face_analysis["emotion"]
+        mouth_result = face_analysis["mouth"]
+        pose_result = face_analysis["pose"]
 
         logger.debug(f"Realtime analysis results for user {current_user.get('username')}: Emotion={emotion_result}, Mouth={mouth_result}, Pose={pose_result}")
         return jsonify({
@@ -60,7 +56,9 @@ def analyze_realtime(current_user):
                 "emotion": emotion_result,
                 "mouth": mouth_result,
                 "pose": pose_result
-            }
+            },
+            # Recommended delay before the client sends its next frame, based on current detector load
+            "next_frame_interval_ms": runtime.load_status()["next_frame_interval_ms"]
         })
 
     except Exception as e:
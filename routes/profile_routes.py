@@ -9,15 +9,13 @@ from bson import ObjectId, errors
 profile_bp = Blueprint('profile_bp', __name__)
 logger = logging.getLogger(__name__)
 
-# Ambil koleksi dari helper
-collections = get_collections()
-users_collection = collections["users"]  # ✅ inisialisasi dengan benar
+# Ambil koleksi dari helper saat request, bukan saat modul di-import,
+# agar import blueprint tidak membuka koneksi MongoDB
+def get_users_collection():
+    return get_collections()["users"]
 
-# =========================================================================
-# === PERBAIKAN UTAMA: Tambahkan inisialisasi untuk login_history_collection ===
-login_history_collection = collections["login_history"] # <--- TAMBAHKAN BARIS INI
-# Pastikan nama "login_history" sesuai dengan nama koleksi di MongoDB Anda.
-# =========================================================================
+def get_login_history_collection():
+    return get_collections()["login_history"]
 
 @profile_bp.route('/update_profile', methods=['PUT'])
 @token_required
@@ -45,7 +43,7 @@ def update_profile(current_user):
             return jsonify({"status": "info", "message": "Tidak ada data yang diubah."}), 200
 
         # Lakukan update di MongoDB
-        result = users_collection.update_one(
+        result = get_users_collection().update_one(
             {"_id": user_id},
             {"$set": update_fields}
         )
@@ -56,7 +54,7 @@ def update_profile(current_user):
         if result.modified_count == 0:
             return jsonify({"status": "info", "message": "Tidak ada perubahan yang diterapkan."}), 200
 
-        updated_user = users_collection.find_one({"_id": user_id}, {"password": 0})
+        updated_user = get_users_collection().find_one({"_id": user_id}, {"password": 0})
         # Pastikan _id dikonversi ke string agar bisa di-JSON-kan
         if updated_user: # Pastikan user ditemukan sebelum mencoba mengakses _id
             updated_user["_id"] = str(updated_user["_id"])
@@ -87,7 +85,7 @@ def get_login_history(current_user):
             logger.error(f"Invalid user ID for login history: {user_id_raw}")
             return jsonify({"status": "fail", "message": "ID user tidak valid"}), 400
 
-        history_cursor = login_history_collection.find(
+        history_cursor = get_login_history_collection().find(
             {"user_id": user_id}
         ).sort("timestamp", -1).limit(5) # Ambil 5 riwayat terbaru
 
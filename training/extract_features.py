@@ -0,0 +1,186 @@
+# training/extract_features.py
+"""
+Ekstraksi fitur paralel dari video training di data/.
+
+Struktur input: data/<direktori_label>/*.mp4 (mis. data/flustereds/flustered.mp4).
+Label diambil dari nama direktori (lihat DIRECTORY_LABELS). Setiap video
+diproses oleh satu proses worker memakai FaceMesh mode video dan pipeline
+yang sama dengan runtime (downscale, crop ROI, fitur vektor), lalu ditulis
+sebagai satu shard .npz float16 (lihat training/shards.py).
+
+Contoh:
+    python training/extract_features.py --stride 3 --workers 4
+    python training/extract_features.py --data-dir data --output-dir features --skip-existing
+"""
+import argparse
+import datetime
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from detectors.landmark_features import FEATURE_NAMES
+from training.shards import write_manifest, write_shard
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Nama direktori dataset -> label ekspresi yang dipakai detektor.
+# Direktori yang tidak terdaftar memakai nama direktorinya sendiri sebagai label.
+DIRECTORY_LABELS = {
+    "flustereds": "gugup",
+    "netrals": "netral",
+}
+
+def discover_videos(data_dir):
+    """Mengembalikan list (path_video, label, nama_direktori) untuk setiap video di data_dir/<label>/."""
+    videos = []
+    for directory in sorted(os.listdir(data_dir)):
+        directory_path = os.path.join(data_dir, directory)
+        if not os.path.isdir(directory_path):
+            continue
+        label = DIRECTORY_LABELS.get(directory, directory)
+        for path in sorted(glob.glob(os.path.join(directory_path, "*"))):
+            if path.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append((path, label, directory))
+    return videos
+
+def shard_path(output_dir, directory, video_path):
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(output_dir, f"{directory}__{stem}.npz")
+
+def extract_video(video_path, label, output_path, stride=1, max_frames=None):
+    """
+    Dijalankan di proses worker: membaca video, menganalisis setiap frame ke-`stride`
+    dengan FaceMesh mode video, lalu menulis shard. Mengembalikan ringkasan.
+    """
+    import cv2
+    from detectors.face_analyzer import analyze_face, create_face_mesh
+
+    started = time.perf_counter()
+    face_mesh = create_face_mesh(static_image_mode=False)
+    capture = cv2.VideoCapture(video_path)
+    features, landmarks, frame_index, detected_expression = [], [], [], []
+    roi = None
+    index = 0
+    sampled = 0
+    try:
+        while max_frames is None or sampled < max_frames:
+            # grab() tanpa decode untuk frame yang dilewati stride
+            if index % stride:
+                if not capture.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            sampled += 1
+            result = analyze_face(frame, face_mesh=face_mesh, roi=roi, include_landmarks=True)
+            roi = result.get("face_box")
+            if result["features"] is not None:
+                features.append(result["features"])
+                landmarks.append(result["landmarks"])
+                frame_index.append(index)
+                detected_expression.append(result["expression"])
+            index += 1
+    finally:
+        capture.release()
+        face_mesh.close()
+
+    write_shard(
+        output_path,
+        features=np.asarray(features, dtype=np.float32).reshape(-1, len(FEATURE_NAMES)),
+        landmarks=np.stack(landmarks) if landmarks else np.zeros((0, 0, 3), dtype=np.float32),
+        frame_index=frame_index,
+        detected_expression=detected_expression,
+        label=label,
+        source=os.path.relpath(video_path, ROOT),
+    )
+    return {
+        "source": os.path.relpath(video_path, ROOT),
+        "shard": os.path.basename(output_path),
+        "label": label,
+        "frames_sampled": sampled,
+        "frames_with_face": len(features),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def run(data_dir, output_dir, stride=1, workers=None, max_frames=None, skip_existing=False):
+    os.makedirs(output_dir, exist_ok=True)
+    videos = discover_videos(data_dir)
+    if not videos:
+        raise SystemExit(f"Tidak ada video di {data_dir}/<label>/")
+
+    jobs = []
+    for video_path, label, directory in videos:
+        output_path = shard_path(output_dir, directory, video_path)
+        if skip_existing and os.path.exists(output_path):
+            logger.info(f"Skipping {video_path}, shard already exists.")
+            continue
+        jobs.append((video_path, label, output_path))
+
+    started = time.perf_counter()
+    summaries = []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    # 'spawn' agar setiap worker membuat graph MediaPipe sendiri dari awal
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(extract_video, video_path, label, output_path, stride, max_frames): video_path
+            for video_path, label, output_path in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+            except Exception as e:
+                logger.error(f"Extraction failed for {futures[future]}: {e}", exc_info=True)
+                continue
+            summaries.append(summary)
+            logger.info(
+                f"{summary['source']}: {summary['frames_with_face']}/{summary['frames_sampled']} frames "
+                f"with face in {summary['seconds']}s"
+            )
+
+    manifest = {
+        "created_at": datetime.datetime.utcnow().isoformat(),
+        "feature_names": list(FEATURE_NAMES),
+        "stride": stride,
+        "max_frames": max_frames,
+        "videos": sorted(summaries, key=lambda summary: summary["source"]),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    write_manifest(output_dir, manifest)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekstraksi fitur landmark paralel dari video training.")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "data"), help="direktori berisi <label>/*.mp4")
+    parser.add_argument("--output-dir", default=os.path.join(ROOT, "features"), help="direktori shard .npz")
+    parser.add_argument("--stride", type=int, default=1, help="analisis setiap frame ke-N")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--max-frames", type=int, default=None, help="batas frame yang dianalisis per video")
+    parser.add_argument("--skip-existing", action="store_true", help="lewati video yang shard-nya sudah ada")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    manifest = run(
+        args.data_dir, args.output_dir,
+        stride=max(1, args.stride), workers=args.workers,
+        max_frames=args.max_frames, skip_existing=args.skip_existing
+    )
+    total = sum(video["frames_with_face"] for video in manifest["videos"])
+    logger.info(f"Extracted {total} frames from {len(manifest['videos'])} videos in {manifest['seconds']}s.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# training/shards.py
+"""
+Format penyimpanan dataset fitur hasil ekstraksi video.
+
+Satu shard .npz per video berisi array kolumnar:
+  - features:    float16 (F, len(FEATURE_NAMES)) fitur geometris seperti di runtime
+  - landmarks:   float16 (F, N, 3) landmark FaceMesh ternormalisasi terhadap frame
+  - frame_index: int32 (F,) indeks frame di video sumber
+  - detected_expression: (F,) label ekspresi dari detektor runtime saat ekstraksi
+  - label, source: label kelas (dari nama direktori) dan path video sumber
+Hanya frame dengan wajah terdeteksi yang disimpan.
+"""
+import glob
+import json
+import os
+
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+
+def write_shard(path, features, landmarks, frame_index, detected_expression, label, source):
+    np.savez_compressed(
+        path,
+        features=np.asarray(features, dtype=np.float16),
+        landmarks=np.asarray(landmarks, dtype=np.float16),
+        frame_index=np.asarray(frame_index, dtype=np.int32),
+        detected_expression=np.asarray(detected_expression, dtype=str),
+        label=np.asarray(label),
+        source=np.asarray(source),
+    )
+
+def write_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST_NAME), "w") as handle:
+        json.dump(manifest, handle, indent=2)
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_NAME)) as handle:
+        return json.load(handle)
+
+def load_shards(directory, with_landmarks=False):
+    """
+    Menggabungkan semua shard di direktori. Mengembalikan dict berisi features
+    (float32), labels, detected_expression, sources, dan landmarks (jika diminta).
+    """
+    features, labels, detected_expression, sources, landmarks = [], [], [], [], []
+    for path in sorted(glob.glob(os.path.join(directory, "*.npz"))):
+        with np.load(path) as shard:
+            count = shard["features"].shape[0]
+            if not count:
+                continue
+            features.append(shard["features"].astype(np.float32))
+            labels.extend([str(shard["label"])] * count)
+            detected_expression.extend(shard["detected_expression"].tolist())
+            sources.extend([str(shard["source"])] * count)
+            if with_landmarks:
+                landmarks.append(shard["landmarks"].astype(np.float32))
+
+    dataset = {
+        "features": np.concatenate(features) if features else np.zeros((0, 0), dtype=np.float32),
+        "labels": np.asarray(labels),
+        "detected_expression": np.asarray(detected_expression),
+        "sources": np.asarray(sources),
+    }
+    if with_landmarks:
+        dataset["landmarks"] = np.concatenate(landmarks) if landmarks else None
+    return dataset
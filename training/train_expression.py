@@ -0,0 +1,109 @@
+# training/train_expression.py
+"""
+Melatih classifier ekspresi (regresi logistik multinomial, NumPy saja) dari
+shard hasil training/extract_features.py dan menyimpan bobotnya ke
+EXPRESSION_MODEL_PATH.
+
+Evaluasi memakai leave-one-video-out: setiap video diuji dengan model yang
+dilatih tanpa video tersebut, sehingga akurasi tidak terdongkrak oleh frame
+yang hampir identik dari video yang sama. Model final dilatih dengan semua data.
+
+Contoh:
+    python training/extract_features.py --stride 3
+    python training/train_expression.py --features-dir features
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import EXPRESSION_MODEL_PATH
+from detectors.expression_classifier import ExpressionClassifier
+from detectors.landmark_features import normalized_landmarks
+from training.shards import load_shards
+
+logger = logging.getLogger(__name__)
+
+def fit_softmax(inputs, targets, num_classes, l2=1e-2, epochs=500, learning_rate=0.5):
+    """Gradient descent full-batch untuk regresi logistik multinomial dengan regularisasi L2."""
+    mean = inputs.mean(axis=0)
+    scale = inputs.std(axis=0) + 1e-6
+    standardized = (inputs - mean) / scale
+    one_hot = np.eye(num_classes, dtype=np.float32)[targets]
+    weights = np.zeros((inputs.shape[1], num_classes), dtype=np.float32)
+    bias = np.zeros(num_classes, dtype=np.float32)
+
+    for _ in range(epochs):
+        logits = standardized @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        gradient = (probabilities - one_hot) / len(standardized)
+        weights -= learning_rate * (standardized.T @ gradient + l2 * weights)
+        bias -= learning_rate * gradient.sum(axis=0)
+    return mean, scale, weights, bias
+
+def train(inputs, labels, **kwargs):
+    label_names = sorted(set(labels.tolist()))
+    targets = np.searchsorted(label_names, labels)
+    mean, scale, weights, bias = fit_softmax(inputs, targets, len(label_names), **kwargs)
+    return ExpressionClassifier(label_names, mean, scale, weights, bias)
+
+def leave_one_video_out(inputs, labels, sources, **kwargs):
+    """Akurasi per video sumber dengan model yang tidak pernah melihat video tersebut."""
+    report = {}
+    for source in sorted(set(sources.tolist())):
+        held_out = sources == source
+        if len(set(labels[~held_out].tolist())) < 2:
+            continue
+        classifier = train(inputs[~held_out], labels[~held_out], **kwargs)
+        probabilities = classifier.predict_proba(inputs[held_out])
+        predicted = np.asarray(classifier.labels)[probabilities.argmax(axis=1)]
+        report[source] = round(float((predicted == labels[held_out]).mean()), 4)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Latih classifier ekspresi dari shard fitur video.")
+    parser.add_argument("--features-dir", default=os.path.join(ROOT, "features"), help="direktori shard .npz")
+    parser.add_argument("--output", default=EXPRESSION_MODEL_PATH, help="path file bobot .npz")
+    parser.add_argument("--l2", type=float, default=1e-2)
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--skip-eval", action="store_true", help="lewati evaluasi leave-one-video-out")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    dataset = load_shards(args.features_dir, with_landmarks=True)
+    if dataset["landmarks"] is None:
+        raise SystemExit(f"Tidak ada shard di {args.features_dir}, jalankan training/extract_features.py dulu.")
+    inputs = normalized_landmarks(dataset["landmarks"])
+    labels = dataset["labels"]
+    hyperparameters = {"l2": args.l2, "epochs": args.epochs, "learning_rate": args.learning_rate}
+
+    report = {
+        "frames": int(len(labels)),
+        "class_counts": {label: int((labels == label).sum()) for label in sorted(set(labels.tolist()))},
+    }
+    if not args.skip_eval:
+        per_video = leave_one_video_out(inputs, labels, dataset["sources"], **hyperparameters)
+        report["leave_one_video_out"] = per_video
+        report["mean_video_accuracy"] = round(float(np.mean(list(per_video.values()))), 4) if per_video else None
+        # Pembanding: seberapa sering detektor saat ekstraksi (aturan) setuju dengan label direktori
+        report["detector_agreement"] = round(float((dataset["detected_expression"] == labels).mean()), 4)
+
+    classifier = train(inputs, labels, **hyperparameters)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    classifier.save(args.output)
+    report["model"] = os.path.relpath(os.path.abspath(args.output), ROOT)
+    report["labels"] = list(classifier.labels)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()